@@ -1 +1 @@
-from .eshop import Product, ShoppingCart, Order
\ No newline at end of file
+from .eshop import Product, ShoppingCart, Order, CartValidationError
\ No newline at end of file
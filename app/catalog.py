@@ -0,0 +1,152 @@
+"""Індекс каталогу товарів для пошуку за префіксом назви та діапазоном цін."""
+
+import math
+import unicodedata
+from bisect import bisect_left, insort
+
+MAX_CHAR = chr(0x10FFFF)
+
+
+def fold_name(name):
+    """
+    Нормалізує назву для пошуку без урахування регістру (зокрема кирилиці).
+
+    :param name: Назва товару.
+    :return: Нормалізований ключ.
+    """
+    return unicodedata.normalize("NFC", name).casefold()
+
+
+class ProductCatalog:
+    """Каталог товарів із відсортованими індексами, що оновлюються інкрементально."""
+
+    def __init__(self, products=()):
+        """
+        Створює каталог і індексує передані товари.
+
+        :param products: Початковий перелік товарів.
+        """
+        self._products = {}
+        self._state = {}
+        self._name_keys = []
+        self._by_price = []
+        self._in_stock_by_price = []
+        for product in products:
+            if product.name in self._products:
+                raise ValueError(f"Product {product} is already in the catalog")
+            self._products[product.name] = product
+            product.catalog = self
+            in_stock = product.available_amount > 0
+            self._state[product.name] = (product.price, in_stock)
+            self._name_keys.append((fold_name(product.name), product.name))
+            self._by_price.append((product.price, product.name))
+            if in_stock:
+                self._in_stock_by_price.append((product.price, product.name))
+        self._name_keys.sort()
+        self._by_price.sort()
+        self._in_stock_by_price.sort()
+
+    def __len__(self):
+        return len(self._products)
+
+    def __contains__(self, name):
+        return name in self._products
+
+    def get(self, name):
+        """
+        Повертає товар за точною назвою.
+
+        :param name: Назва товару.
+        :return: Product або None.
+        """
+        return self._products.get(name)
+
+    def add(self, product):
+        """
+        Додає товар до каталогу й підписує каталог на його зміни.
+
+        :param product: Товар.
+        :raises ValueError: Якщо товар з такою назвою вже є.
+        """
+        if product.name in self._products:
+            raise ValueError(f"Product {product} is already in the catalog")
+        self._products[product.name] = product
+        product.catalog = self
+        insort(self._name_keys, (fold_name(product.name), product.name))
+        self._index(product)
+
+    def remove(self, product):
+        """
+        Видаляє товар з каталогу.
+
+        :param product: Товар.
+        """
+        if self._products.pop(product.name, None) is None:
+            return
+        product.catalog = None
+        self._name_keys.pop(bisect_left(self._name_keys, (fold_name(product.name), product.name)))
+        self._unindex(product.name)
+
+    def product_changed(self, product):
+        """
+        Оновлює індекси після зміни ціни або залишку товару.
+
+        :param product: Змінений товар.
+        """
+        price, in_stock = self._state[product.name]
+        if price == product.price and in_stock == (product.available_amount > 0):
+            return
+        self._unindex(product.name)
+        self._index(product)
+
+    def search_prefix(self, prefix, in_stock=False, limit=50):
+        """
+        Шукає товари, назва яких починається з префікса (без урахування регістру).
+
+        :param prefix: Префікс назви.
+        :param in_stock: Повертати лише товари в наявності.
+        :param limit: Максимальна кількість результатів.
+        :return: Список товарів у порядку назв.
+        """
+        key = fold_name(prefix)
+        start = bisect_left(self._name_keys, (key,))
+        end = bisect_left(self._name_keys, (key + MAX_CHAR,), lo=start)
+        result = []
+        for position in range(start, end):
+            product = self._products[self._name_keys[position][1]]
+            if in_stock and product.available_amount <= 0:
+                continue
+            result.append(product)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def price_range(self, min_price=-math.inf, max_price=math.inf, in_stock=False, limit=None):
+        """
+        Повертає товари з ціною в межах [min_price, max_price].
+
+        :param min_price: Мінімальна ціна.
+        :param max_price: Максимальна ціна.
+        :param in_stock: Повертати лише товари в наявності.
+        :param limit: Максимальна кількість результатів.
+        :return: Список товарів у порядку зростання ціни.
+        """
+        index = self._in_stock_by_price if in_stock else self._by_price
+        start = bisect_left(index, (min_price,))
+        end = bisect_left(index, (math.nextafter(max_price, math.inf),), lo=start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._products[name] for _, name in index[start:end]]
+
+    def _index(self, product):
+        in_stock = product.available_amount > 0
+        self._state[product.name] = (product.price, in_stock)
+        insort(self._by_price, (product.price, product.name))
+        if in_stock:
+            insort(self._in_stock_by_price, (product.price, product.name))
+
+    def _unindex(self, name):
+        price, in_stock = self._state.pop(name)
+        self._by_price.pop(bisect_left(self._by_price, (price, name)))
+        if in_stock:
+            self._in_stock_by_price.pop(bisect_left(self._in_stock_by_price, (price, name)))
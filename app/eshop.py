@@ -1,14 +1,21 @@
 """Модуль для керування продуктами, кошиком і замовленнями в інтернет-магазині."""
 
+import asyncio
 import uuid
+from contextlib import ExitStack
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from services import ShippingService
+from services.profiling import profiled
 
 
 class Product:
     """Клас, що представляє товар у магазині."""
 
+    journal = None
+    catalog = None
+    inventory = None
+
     def __init__(self, name, price, available_amount):
         """
         Ініціалізує новий товар.
@@ -20,6 +27,7 @@ class Product:
         self.name = name
         self.price = price
         self.available_amount = available_amount
+        self.version = 0
 
     def is_available(self, requested_amount):
         """
@@ -28,6 +36,8 @@ class Product:
         :param requested_amount: Бажана кількість.
         :return: True, якщо доступно.
         """
+        if self.inventory is not None:
+            return self.inventory.get(self.name) >= requested_amount
         return self.available_amount >= requested_amount
 
     def buy(self, requested_amount):
@@ -35,8 +45,51 @@ class Product:
         Зменшує кількість товару після покупки.
 
         :param requested_amount: Кількість для купівлі.
+        :raises ValueError: Якщо у спільному складі товару недостатньо.
+        """
+        if self.inventory is not None:
+            self.available_amount = self.inventory.decrement(self.name, requested_amount)
+        else:
+            self.available_amount -= requested_amount
+        if self.journal is not None:
+            self.journal.record_buy(self.name, requested_amount)
+        self._changed()
+
+    def restock(self, additional_amount):
+        """
+        Поповнює запас товару.
+
+        :param additional_amount: Кількість нових одиниць.
+        :raises ValueError: Якщо кількість не додатна.
+        """
+        if additional_amount <= 0:
+            raise ValueError("Restock amount must be greater than zero")
+        if self.inventory is not None:
+            self.available_amount = self.inventory.increment(self.name, additional_amount)
+        else:
+            self.available_amount += additional_amount
+        if self.journal is not None:
+            self.journal.record_restock(self.name, additional_amount)
+        self._changed()
+
+    def update_price(self, new_price):
+        """
+        Змінює ціну товару.
+
+        :param new_price: Нова ціна.
+        :raises ValueError: Якщо ціна не додатна.
         """
-        self.available_amount -= requested_amount
+        if new_price <= 0:
+            raise ValueError("Price must be greater than zero")
+        self.price = new_price
+        if self.journal is not None:
+            self.journal.record_price(self.name, new_price)
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        if self.catalog is not None:
+            self.catalog.product_changed(self)
 
     def __eq__(self, other):
         return self.name == other.name
@@ -51,12 +104,28 @@ class Product:
         return self.name
 
 
+class CartValidationError(ValueError):
+    """Помилка пакетної зміни кошика з переліком усіх некоректних рядків."""
+
+    def __init__(self, errors):
+        """
+        Створює помилку.
+
+        :param errors: Список пар (товар, повідомлення).
+        """
+        super().__init__("; ".join(f"{product}: {message}" for product, message in errors))
+        self.errors = errors
+
+
 class ShoppingCart:
     """Клас для управління кошиком користувача."""
 
+    registry = None
+
     def __init__(self):
         """Створює порожній кошик."""
         self.products = {}
+        self.added_prices = {}
 
     def contains_product(self, product):
         """
@@ -67,6 +136,7 @@ class ShoppingCart:
         """
         return product in self.products
 
+    @profiled
     def calculate_total(self):
         """
         Обчислює загальну суму кошика.
@@ -75,6 +145,7 @@ class ShoppingCart:
         """
         return sum(p.price * count for p, count in self.products.items())
 
+    @profiled
     def add_product(self, product: Product, amount: int):
         """
         Додає продукт до кошика.
@@ -85,7 +156,90 @@ class ShoppingCart:
         """
         if not product.is_available(amount):
             raise ValueError(f"Product {product} has only {product.available_amount} items")
+        self._set_line(product, amount)
+
+    @profiled
+    def add_many(self, lines):
+        """
+        Додає багато рядків за один прохід валідації.
+
+        Повторні рядки одного товару сумуються. Як і add_product, фіксує поточну ціну
+        для кожного доданого рядка. Якщо хоч один рядок некоректний, кошик не змінюється.
+
+        :param lines: Словник {товар: кількість} або ітерований набір пар (товар, кількість).
+        :raises CartValidationError: З переліком усіх некоректних рядків.
+        """
+        amounts = {}
+        errors = []
+        for product, amount in lines.items() if isinstance(lines, dict) else lines:
+            error = self._line_error(product, amount)
+            if error:
+                errors.append((product, error))
+            else:
+                amounts[product] = amounts.get(product, 0) + amount
+        self._apply(amounts, errors, reprice=True)
+
+    @profiled
+    def update_many(self, quantities):
+        """
+        Змінює кількість багатьох товарів, що вже є в кошику.
+
+        :param quantities: Словник {товар: нова кількість}.
+        :raises CartValidationError: З переліком усіх некоректних рядків; кошик не змінюється.
+        """
+        amounts = {}
+        errors = []
+        for product, amount in quantities.items():
+            error = self._line_error(product, amount)
+            if not error and product not in self.products:
+                error = "product is not in the cart"
+            if error:
+                errors.append((product, error))
+            else:
+                amounts[product] = amount
+        self._apply(amounts, errors)
+
+    @profiled
+    def merge(self, other_cart):
+        """
+        Додає вміст іншого кошика, сумуючи кількості однакових товарів.
+
+        Інший кошик не змінюється.
+
+        :param other_cart: ShoppingCart, що зливається з поточним.
+        :raises CartValidationError: З переліком усіх некоректних рядків; кошик не змінюється.
+        """
+        self._apply({
+            product: self.products.get(product, 0) + amount for product, amount in other_cart.products.items()
+        }, [], other_cart.added_prices)
+
+    def _apply(self, amounts, errors, added_prices=None, reprice=False):
+        for product, amount in amounts.items():
+            if not product.is_available(amount):
+                errors.append((product, f"only {product.available_amount} items available"))
+        if errors:
+            raise CartValidationError(errors)
+        for product, amount in amounts.items():
+            if reprice:
+                self._set_line(product, amount)
+                continue
+            # Ціна на момент додавання зберігається для рядків, що вже є в кошику або прийшли з іншого кошика.
+            price = self.added_prices.get(product, (added_prices or {}).get(product, product.price))
+            self._set_line(product, amount, price)
+
+    @staticmethod
+    def _line_error(product, amount):
+        if not product:
+            return "product cannot be None"
+        if not isinstance(amount, int) or isinstance(amount, bool) or amount <= 0:
+            return f"amount must be a positive integer, got {amount!r}"
+        return None
+
+    def _set_line(self, product, amount, price=None):
         self.products[product] = amount
+        self.added_prices[product] = product.price if price is None else price
+        if self.registry is not None:
+            self.registry.line_added(self, product)
 
     def remove_product(self, product):
         """
@@ -95,18 +249,37 @@ class ShoppingCart:
         """
         if product in self.products:
             del self.products[product]
+            self.added_prices.pop(product, None)
+            if self.registry is not None:
+                self.registry.line_removed(self, product)
 
+    @profiled
     def submit_cart_order(self):
         """
         Оформлює замовлення і очищує кошик.
 
         :return: Список ID придбаних продуктів.
+        :raises ValueError: Якщо у спільному складі бракує товару; тоді нічого не списується.
         """
         product_ids = []
-        for product, count in self.products.items():
-            product.buy(count)
-            product_ids.append(str(product))
+        with ExitStack() as stack:
+            for journal in {product.journal for product in self.products if product.journal is not None}:
+                stack.enter_context(journal.batch())
+            for inventory in {product.inventory for product in self.products if product.inventory is not None}:
+                stack.enter_context(inventory.locked(
+                    [product.name for product in self.products if product.inventory is inventory]
+                ))
+            for product, count in self.products.items():
+                if product.inventory is not None and not product.is_available(count):
+                    raise ValueError(f"Product {product} has only {product.inventory.get(product.name)} items")
+            for product, count in self.products.items():
+                product.buy(count)
+                product_ids.append(str(product))
+        if self.registry is not None:
+            for product in self.products:
+                self.registry.line_removed(self, product)
         self.products.clear()
+        self.added_prices.clear()
         return product_ids
 
 
@@ -125,14 +298,74 @@ class Order:
         :param shipping_type: Тип доставки.
         :param due_date: Дата, до якої має бути виконана доставка.
         :return: Об'єкт доставки.
+        :raises services.admission.OverloadedError: Якщо служба доставки перевантажена.
+        """
+        with self.shipping_service.admit():
+            if not due_date:
+                due_date = datetime.now(timezone.utc) + timedelta(seconds=3)
+            product_ids = self.cart.submit_cart_order()
+            return self.shipping_service.create_shipping(
+                shipping_type, product_ids, self.order_id, due_date
+            )
+
+    def place_order_async(self, shipping_type, due_date: datetime = None, callback=None):
+        """
+        Оформлює замовлення без очікування служби доставки.
+
+        Параметри доставки перевіряються, слот допуску займається та товар
+        списується одразу, а створення доставки виконується у фоні, утримуючи цей слот.
+        Якщо доставку створити не вдалося, списаний товар повертається на склад.
+
+        :param shipping_type: Тип доставки.
+        :param due_date: Дата, до якої має бути виконана доставка.
+        :param callback: Необов'язкова функція, що отримає завершений Future.
+        :return: concurrent.futures.Future, result() якого повертає ID доставки.
+        :raises ValueError: Якщо тип доставки або дата некоректні.
+        :raises services.admission.OverloadedError: Якщо служба доставки перевантажена.
         """
         if not due_date:
             due_date = datetime.now(timezone.utc) + timedelta(seconds=3)
-        product_ids = self.cart.submit_cart_order()
-        print(due_date)
-        return self.shipping_service.create_shipping(
-            shipping_type, product_ids, self.order_id, due_date
-        )
+        self.shipping_service.validate_shipping(shipping_type, due_date)
+        admission_slot = self.shipping_service.reserve_admission()
+        lines = dict(self.cart.products)
+        committed = False
+        try:
+            product_ids = self.cart.submit_cart_order()
+            committed = True
+            future = self.shipping_service.create_shipping_async(
+                shipping_type, product_ids, self.order_id, due_date, admission_slot
+            )
+        except BaseException:
+            if admission_slot is not None:
+                admission_slot.release(failed=True)
+            if committed:
+                self._restock(lines)
+            raise
+        future.add_done_callback(lambda done: self._restock_if_failed(done, lines))
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    @staticmethod
+    def _restock_if_failed(future, lines):
+        """
+        Повертає товар на склад, якщо фонове створення доставки скасовано або завершилося помилкою.
+
+        :param future: Завершений Future створення доставки.
+        :param lines: Словник {товар: кількість}, списаний під час оформлення.
+        """
+        if future.cancelled() or future.exception() is not None:
+            Order._restock(lines)
+
+    @staticmethod
+    def _restock(lines):
+        """
+        Повертає на склад товар замовлення, для якого не створено доставку.
+
+        :param lines: Словник {товар: кількість}, списаний під час оформлення.
+        """
+        for product, count in lines.items():
+            product.restock(count)
 
 
 @dataclass
@@ -149,3 +382,45 @@ class Shipment:
         :return: Поточний статус доставки.
         """
         return self.shipping_service.check_status(self.shipping_id)
+
+    def wait_for_status(self, target_statuses, timeout=None):
+        """
+        Блокує виконання, доки доставка не перейде в один із цільових статусів.
+
+        :param target_statuses: Очікувані статуси.
+        :param timeout: Максимальний час очікування в секундах.
+        :return: Статус, якого досягла доставка.
+        :raises concurrent.futures.TimeoutError: Якщо статус не досягнуто вчасно.
+        """
+        return self.shipping_service.wait_for_status(self.shipping_id, target_statuses, timeout)
+
+    async def wait_for_status_async(self, target_statuses, timeout=None):
+        """
+        Асинхронний варіант wait_for_status зі спільним опитувачем сервісу.
+
+        :param target_statuses: Очікувані статуси.
+        :param timeout: Максимальний час очікування в секундах.
+        :return: Статус, якого досягла доставка.
+        :raises asyncio.TimeoutError: Якщо статус не досягнуто вчасно.
+        """
+        future = self.shipping_service.status_waiter.submit(self.shipping_id, target_statuses)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    @staticmethod
+    def check_many(shipments):
+        """
+        Перевіряє статуси багатьох доставок пакетними запитами.
+
+        :param shipments: Список об'єктів доставки.
+        :return: Словник {shipping_id: статус}.
+        """
+        by_service = {}
+        for shipment in shipments:
+            by_service.setdefault(id(shipment.shipping_service), (shipment.shipping_service, []))[1].append(
+                shipment.shipping_id
+            )
+
+        statuses = {}
+        for shipping_service, shipping_ids in by_service.values():
+            statuses.update(shipping_service.check_statuses(shipping_ids))
+        return statuses
@@ -0,0 +1,313 @@
+"""Журнал подій складу: лише дописування, групове fsync і швидке відновлення через mmap."""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+
+from .eshop import Product
+
+EVENT_SET = 1
+EVENT_BUY = 2
+EVENT_RESTOCK = 3
+EVENT_PRICE = 4
+
+RECORD_HEADER = struct.Struct("<II")
+EVENT_BODY = struct.Struct("<BqdH")
+SNAPSHOT_MAGIC = b"INVS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHQI")
+SNAPSHOT_ENTRY = struct.Struct("<qdH")
+
+LOG_FILE_NAME = "events.log"
+SNAPSHOT_FILE_NAME = "snapshot.bin"
+
+
+def encode_event(event_type, name, amount=0, price=0.0):
+    """
+    Кодує подію у запис із префіксом довжини та контрольною сумою.
+
+    :param event_type: Тип події (EVENT_*).
+    :param name: Назва товару.
+    :param amount: Кількість для SET/BUY/RESTOCK.
+    :param price: Ціна для SET/PRICE.
+    :return: Байти запису.
+    """
+    encoded_name = name.encode("utf-8")
+    payload = EVENT_BODY.pack(event_type, amount, price, len(encoded_name)) + encoded_name
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def apply_event(state, event_type, name, amount, price):
+    """
+    Застосовує подію до стану {назва: [кількість, ціна]}.
+
+    :param state: Словник стану складу.
+    :param event_type: Тип події.
+    :param name: Назва товару.
+    :param amount: Кількість.
+    :param price: Ціна.
+    """
+    if event_type == EVENT_SET:
+        state[name] = [amount, price]
+        return
+    entry = state.setdefault(name, [0, 0.0])
+    if event_type == EVENT_BUY:
+        entry[0] -= amount
+    elif event_type == EVENT_RESTOCK:
+        entry[0] += amount
+    elif event_type == EVENT_PRICE:
+        entry[1] = price
+
+
+def read_snapshot(path):
+    """
+    Читає знімок стану складу.
+
+    :param path: Шлях до файлу знімка.
+    :return: Пара (стан, зміщення в журналі, до якого знімок актуальний).
+    """
+    if not os.path.exists(path):
+        return {}, 0
+    with open(path, "rb") as snapshot_file:
+        data = snapshot_file.read()
+    magic, version, log_offset, count = SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} is not an inventory snapshot of version {SNAPSHOT_VERSION}")
+    state = {}
+    position = SNAPSHOT_HEADER.size
+    for _ in range(count):
+        amount, price, name_length = SNAPSHOT_ENTRY.unpack_from(data, position)
+        position += SNAPSHOT_ENTRY.size
+        state[data[position:position + name_length].decode("utf-8")] = [amount, price]
+        position += name_length
+    return state, log_offset
+
+
+def replay_log(path, state, offset=0):
+    """
+    Відтворює події журналу з указаного зміщення, читаючи файл через mmap.
+
+    Читання зупиняється на першому неповному або пошкодженому записі.
+
+    :param path: Шлях до журналу.
+    :param state: Стан, до якого застосовуються події.
+    :param offset: Зміщення першого запису.
+    :return: Зміщення кінця останнього коректного запису.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) <= offset:
+        return offset
+    with open(path, "rb") as log_file, mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        while offset + RECORD_HEADER.size <= size:
+            length, checksum = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            if length < EVENT_BODY.size or start + length > size:
+                break
+            payload = data[start:start + length]
+            if zlib.crc32(payload) != checksum:
+                break
+            event_type, amount, price, name_length = EVENT_BODY.unpack_from(payload, 0)
+            name = payload[EVENT_BODY.size:EVENT_BODY.size + name_length].decode("utf-8")
+            apply_event(state, event_type, name, amount, price)
+            offset = start + length
+    return offset
+
+
+def replay(directory, catalog=None):
+    """
+    Відновлює залишки та ціни товарів зі знімка та журналу.
+
+    :param directory: Каталог журналу.
+    :param catalog: Необов'язковий словник {назва: Product}, який оновлюється на місці.
+    :return: Словник {назва: Product}.
+    """
+    state, offset = read_snapshot(os.path.join(directory, SNAPSHOT_FILE_NAME))
+    replay_log(os.path.join(directory, LOG_FILE_NAME), state, offset)
+    products = catalog if catalog is not None else {}
+    for name, (amount, price) in state.items():
+        if name in products:
+            products[name].available_amount = amount
+            products[name].price = price
+        else:
+            products[name] = Product(name, price, amount)
+    return products
+
+
+class InventoryJournal:
+    """Довговічний журнал змін складу з груповим комітом."""
+
+    def __init__(self, directory, snapshot_every=10000):
+        """
+        Відкриває або створює журнал, відновлюючи поточний стан.
+
+        :param directory: Каталог для журналу та знімка.
+        :param snapshot_every: Через скільки подій робити знімок (0 - вимкнено).
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, LOG_FILE_NAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE_NAME)
+        self.snapshot_every = snapshot_every
+        self.state, offset = read_snapshot(self.snapshot_path)
+        valid_end = replay_log(self.log_path, self.state, offset)
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > valid_end:
+            os.truncate(self.log_path, valid_end)
+        self._file = open(self.log_path, "ab")  # pylint: disable=consider-using-with
+        self._buffer = bytearray()
+        self._next_seq = 1
+        self._durable_seq = 0
+        self._flushing = False
+        self._condition = threading.Condition()
+        self._snapshot_lock = threading.Lock()
+        self._local = threading.local()
+        self.events_since_snapshot = 0
+        self.fsyncs = 0
+
+    def track(self, product):
+        """
+        Підключає товар до журналу та фіксує його поточний стан.
+
+        :param product: Товар.
+        """
+        product.journal = self
+        self.record(EVENT_SET, product.name, product.available_amount, product.price)
+
+    def record(self, event_type, name, amount=0, price=0.0):
+        """
+        Дописує подію; повертається, коли подію записано на диск.
+
+        Усередині batch() очікування відкладається до кінця пакета.
+
+        :param event_type: Тип події.
+        :param name: Назва товару.
+        :param amount: Кількість.
+        :param price: Ціна.
+        """
+        record = encode_event(event_type, name, amount, price)
+        with self._condition:
+            apply_event(self.state, event_type, name, amount, price)
+            self._buffer += record
+            seq = self._next_seq
+            self._next_seq += 1
+            self.events_since_snapshot += 1
+            if getattr(self._local, "batch_depth", 0):
+                self._local.batch_seq = seq
+                return
+            self._wait_durable(seq)
+        if self.snapshot_every and self.events_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def record_buy(self, name, amount):
+        """
+        Фіксує купівлю товару.
+
+        :param name: Назва товару.
+        :param amount: Куплена кількість.
+        """
+        self.record(EVENT_BUY, name, amount)
+
+    def record_restock(self, name, amount):
+        """
+        Фіксує поповнення запасу.
+
+        :param name: Назва товару.
+        :param amount: Додана кількість.
+        """
+        self.record(EVENT_RESTOCK, name, amount)
+
+    def record_price(self, name, price):
+        """
+        Фіксує зміну ціни.
+
+        :param name: Назва товару.
+        :param price: Нова ціна.
+        """
+        self.record(EVENT_PRICE, name, price=price)
+
+    @contextmanager
+    def batch(self):
+        """Групує події потоку так, що на весь пакет припадає одне очікування fsync."""
+        self._local.batch_depth = getattr(self._local, "batch_depth", 0) + 1
+        try:
+            yield self
+        finally:
+            self._local.batch_depth -= 1
+            if not self._local.batch_depth and getattr(self._local, "batch_seq", 0):
+                seq, self._local.batch_seq = self._local.batch_seq, 0
+                with self._condition:
+                    self._wait_durable(seq)
+
+    def sync(self):
+        """Чекає, доки всі дописані події стануть довговічними."""
+        with self._condition:
+            self._wait_durable(self._next_seq - 1)
+
+    def snapshot(self):
+        """Записує знімок стану, актуальний на поточну позицію журналу."""
+        with self._snapshot_lock:
+            with self._condition:
+                while self._buffer or self._flushing:
+                    self._wait_durable(self._next_seq - 1)
+                offset = self._file.tell()
+                state = {name: tuple(entry) for name, entry in self.state.items()}
+                self.events_since_snapshot = 0
+
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "wb") as snapshot_file:
+                snapshot_file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, offset, len(state)))
+                for name, (amount, price) in state.items():
+                    encoded_name = name.encode("utf-8")
+                    snapshot_file.write(SNAPSHOT_ENTRY.pack(amount, price, len(encoded_name)))
+                    snapshot_file.write(encoded_name)
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+    def close(self):
+        """Скидає буфер на диск і закриває журнал."""
+        self.sync()
+        self._file.close()
+
+    def _wait_durable(self, seq):
+        while self._durable_seq < seq:
+            if self._flushing:
+                self._condition.wait()
+                continue
+            self._flushing = True
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            flushed_seq = self._next_seq - 1
+            offset = self._file.tell()
+            flushed = False
+            self._condition.release()
+            try:
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                flushed = True
+            finally:
+                if not flushed:
+                    self._discard_partial_write(offset)
+                self._condition.acquire()
+                self._flushing = False
+                if not flushed:
+                    # Невдалий запис повертається в буфер: наступний лідер повторить його, а не оголосить довговічним.
+                    self._buffer[0:0] = data
+                self._condition.notify_all()
+            self._durable_seq = flushed_seq
+            self.fsyncs += 1
+
+    def _discard_partial_write(self, offset):
+        """
+        Обрізає журнал до стану перед невдалим скиданням і знову відкриває файл.
+
+        :param offset: Розмір журналу до початку скидання.
+        """
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        os.truncate(self.log_path, offset)
+        self._file = open(self.log_path, "ab")  # pylint: disable=consider-using-with
@@ -0,0 +1,244 @@
+"""Генератор навантаження, що імітує покупців від кошика до перевірки доставки."""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+
+from services import ShippingService
+from services.config import SHIPPING_NAMESPACE
+from services.profiling import install_from_env
+from .eshop import Product, ShoppingCart, Order, Shipment
+
+STAGES = ("add_product", "place_order", "check_status", "session")
+
+
+class LoadReport:
+    """Збирає затримки та помилки за етапами сценарію."""
+
+    def __init__(self):
+        """Створює порожній звіт."""
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.processed_shipments = 0
+        self._lock = threading.Lock()
+
+    def record(self, stage, latency, error=False):
+        """
+        Записує результат одного етапу.
+
+        :param stage: Назва етапу.
+        :param latency: Затримка в секундах.
+        :param error: Чи завершився етап помилкою.
+        """
+        with self._lock:
+            if error:
+                self.errors[stage] += 1
+            else:
+                self.latencies[stage].append(latency)
+
+    def add_processed(self, count):
+        """
+        Збільшує лічильник оброблених споживачем доставок.
+
+        :param count: Кількість оброблених доставок.
+        """
+        with self._lock:
+            self.processed_shipments += count
+
+    def summary(self, elapsed):
+        """
+        Формує підсумок: пропускна здатність, частка помилок і перцентилі затримок.
+
+        :param elapsed: Тривалість тесту в секундах.
+        :return: Словник зі статистикою за етапами.
+        """
+        with self._lock:
+            stages = {}
+            for stage in STAGES:
+                latencies = sorted(self.latencies[stage])
+                total = len(latencies) + self.errors[stage]
+                stages[stage] = {
+                    "count": total,
+                    "throughput_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                    "error_rate": round(self.errors[stage] / total, 4) if total else 0.0,
+                    "p50_ms": percentile_ms(latencies, 50),
+                    "p90_ms": percentile_ms(latencies, 90),
+                    "p99_ms": percentile_ms(latencies, 99),
+                    "max_ms": percentile_ms(latencies, 100),
+                }
+            return {
+                "elapsed_seconds": round(elapsed, 2),
+                "processed_shipments": self.processed_shipments,
+                "stages": stages,
+            }
+
+
+def percentile_ms(sorted_latencies, percent):
+    """
+    Обчислює перцентиль методом найближчого рангу.
+
+    :param sorted_latencies: Відсортовані затримки в секундах.
+    :param percent: Перцентиль від 0 до 100.
+    :return: Значення в мілісекундах або None, якщо даних немає.
+    """
+    if not sorted_latencies:
+        return None
+    rank = max(1, -(-percent * len(sorted_latencies) // 100))
+    return round(sorted_latencies[int(rank) - 1] * 1000, 3)
+
+
+def arrival_times(rate, duration, ramp_up):
+    """
+    Генерує моменти прибуття покупців для відкритої моделі навантаження.
+
+    Під час розгону інтенсивність лінійно зростає від нуля до rate.
+
+    :param rate: Цільова кількість сесій за секунду.
+    :param duration: Загальна тривалість у секундах.
+    :param ramp_up: Тривалість розгону в секундах.
+    :return: Генератор зміщень від початку тесту в секундах.
+    """
+    ramp_arrivals = rate * ramp_up / 2
+    arrival = 1
+    while True:
+        if arrival < ramp_arrivals:
+            offset = (2 * ramp_up * arrival / rate) ** 0.5
+        else:
+            offset = ramp_up + (arrival - ramp_arrivals) / rate
+        if offset >= duration:
+            return
+        yield offset
+        arrival += 1
+
+
+def run_session(shipping_service, products, report, scheduled_at):
+    """
+    Виконує одну сесію покупця: додавання товару, замовлення, перевірку статусу.
+
+    :param shipping_service: Служба доставки.
+    :param products: Список товарів каталогу.
+    :param report: Звіт для запису результатів.
+    :param scheduled_at: Запланований момент початку (time.perf_counter).
+    """
+    cart = ShoppingCart()
+    shipping_id = None
+    session_ok = True
+    for stage in STAGES[:-1]:
+        started = time.perf_counter()
+        try:
+            if stage == "add_product":
+                cart.add_product(random.choice(products), random.randint(1, 3))
+            elif stage == "place_order":
+                shipping_id = Order(cart, shipping_service, str(uuid.uuid4())).place_order(
+                    random.choice(ShippingService.list_available_shipping_type()),
+                    due_date=datetime.now(timezone.utc) + timedelta(minutes=5)
+                )
+            else:
+                Shipment(shipping_id, shipping_service).check_shipping_status()
+        except Exception:  # pylint: disable=broad-except
+            report.record(stage, time.perf_counter() - started, error=True)
+            session_ok = False
+            break
+        report.record(stage, time.perf_counter() - started)
+    report.record("session", time.perf_counter() - scheduled_at, error=not session_ok)
+
+
+def build_shipping_service(backend, namespace=SHIPPING_NAMESPACE):
+    """
+    Створює службу доставки для обраного бекенду.
+
+    :param backend: "memory" або "localstack".
+    :param namespace: Простір імен таблиці та черги в LocalStack.
+    :return: Об'єкт ShippingService.
+    """
+    if backend == "memory":
+        from services.memory import InMemoryShippingRepository, InMemoryShippingPublisher  # pylint: disable=import-outside-toplevel
+        return ShippingService(InMemoryShippingRepository(), InMemoryShippingPublisher())
+
+    from services.repository import ShippingRepository  # pylint: disable=import-outside-toplevel
+    from services.publisher import ShippingPublisher  # pylint: disable=import-outside-toplevel
+    return ShippingService(ShippingRepository(namespace=namespace), ShippingPublisher(namespace=namespace))
+
+
+def run_load(shipping_service, rate, duration, ramp_up=0.0, users=50, consumers=1, catalog_size=100):
+    """
+    Запускає навантаження з відкритою моделлю прибуття та споживачами черги.
+
+    :param shipping_service: Служба доставки.
+    :param rate: Цільова кількість сесій за секунду.
+    :param duration: Тривалість у секундах.
+    :param ramp_up: Тривалість розгону в секундах.
+    :param users: Максимальна кількість одночасних віртуальних користувачів.
+    :param consumers: Кількість потоків, що обробляють чергу доставок.
+    :param catalog_size: Кількість товарів у каталозі.
+    :return: Підсумок звіту.
+    """
+    products = [
+        Product(name=f"product-{i}", price=random.randint(10, 5000), available_amount=10 ** 9)
+        for i in range(catalog_size)
+    ]
+    report = LoadReport()
+    stop_event = threading.Event()
+
+    def consume():
+        while not stop_event.is_set():
+            try:
+                report.add_processed(len(shipping_service.process_shipping_batch()))
+            except Exception:  # pylint: disable=broad-except
+                stop_event.wait(0.1)
+
+    consumer_threads = [threading.Thread(target=consume, daemon=True) for _ in range(consumers)]
+    for thread in consumer_threads:
+        thread.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        for offset in arrival_times(rate, duration, ramp_up):
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(run_session, shipping_service, products, report, started + offset)
+    elapsed = time.perf_counter() - started
+
+    stop_event.set()
+    for thread in consumer_threads:
+        thread.join()
+    return report.summary(elapsed)
+
+
+def main(argv=None):
+    """Точка входу командного рядка."""
+    parser = argparse.ArgumentParser(description="Simulate shoppers placing orders end-to-end")
+    parser.add_argument("--backend", choices=["memory", "localstack"], default="memory")
+    parser.add_argument("--rate", type=float, default=50, help="Target sessions per second")
+    parser.add_argument("--duration", type=float, default=10, help="Test duration in seconds")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Seconds to ramp up to the target rate")
+    parser.add_argument("--users", type=int, default=50, help="Maximum concurrent virtual users")
+    parser.add_argument("--consumers", type=int, default=1, help="Threads draining the shipping queue")
+    parser.add_argument("--products", type=int, default=100, help="Catalog size")
+    parser.add_argument("--isolated", action="store_true",
+                        help="Run against a temporary LocalStack namespace that is removed afterwards")
+    args = parser.parse_args(argv)
+    install_from_env()
+
+    with ExitStack() as stack:
+        namespace = SHIPPING_NAMESPACE
+        if args.backend == "localstack" and args.isolated:
+            from services.provisioning import isolated_namespace  # pylint: disable=import-outside-toplevel
+            namespace = stack.enter_context(isolated_namespace("loadgen"))
+        summary = run_load(
+            build_shipping_service(args.backend, namespace), args.rate, args.duration,
+            ramp_up=args.ramp_up, users=args.users, consumers=args.consumers, catalog_size=args.products,
+        )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Пакетне обчислення сум багатьох кошиків за допомогою NumPy."""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+
+FLOAT_EXACT_INT_LIMIT = 2 ** 53
+
+
+@dataclass
+class CartMatrix:
+    """Розріджена матриця кошик×товар у форматі CSR."""
+
+    indptr: np.ndarray
+    columns: np.ndarray
+    quantities: np.ndarray
+    products: list
+
+    @classmethod
+    def from_carts(cls, carts):
+        """
+        Будує матрицю кількостей з переліку кошиків.
+
+        Рядки кожного кошика зберігають порядок його словника products.
+
+        :param carts: Послідовність ShoppingCart.
+        :return: CartMatrix.
+        """
+        product_index = {}
+        indptr = np.zeros(len(carts) + 1, dtype=np.int64)
+        columns = []
+        quantities = []
+        for row, cart in enumerate(carts):
+            for product, count in cart.products.items():
+                columns.append(product_index.setdefault(product, len(product_index)))
+                quantities.append(count)
+            indptr[row + 1] = len(columns)
+        return cls(
+            indptr=indptr,
+            columns=np.asarray(columns, dtype=np.int64),
+            quantities=np.asarray(quantities, dtype=np.float64),
+            products=list(product_index),
+        )
+
+    def price_vector(self, discounts=None):
+        """
+        Повертає вектор цін товарів з урахуванням знижок.
+
+        :param discounts: Необов'язковий словник {Product: частка знижки від 0 до 1}.
+        :return: Масив цін у порядку стовпців матриці.
+        """
+        prices = np.fromiter((product.price for product in self.products), dtype=np.float64, count=len(self.products))
+        if discounts:
+            rates = np.fromiter(
+                (discounts.get(product, 0.0) for product in self.products), dtype=np.float64, count=len(self.products)
+            )
+            prices = np.where(rates != 0, prices * (1.0 - rates), prices)
+        return prices
+
+    def totals(self, prices):
+        """
+        Обчислює суми всіх кошиків.
+
+        Рядки додаються послідовно в порядку кошика, тож без знижок результат
+        побітово збігається з ShoppingCart.calculate_total.
+
+        :param prices: Вектор цін товарів.
+        :return: Масив сум у порядку кошиків.
+        """
+        # bincount додає ваги по черзі в порядку масиву, тобто так само, як sum() у calculate_total.
+        return self._row_sums(self.quantities * prices[self.columns])
+
+    def _row_sums(self, values):
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        return np.bincount(rows, weights=values, minlength=len(self.indptr) - 1).astype(np.float64)
+
+    def is_float_exact(self):
+        """
+        Перевіряє, що float64 дає той самий результат, що й скалярний розрахунок.
+
+        Дійсні ціни рахуються однаково; цілі - лише доки жодна часткова сума не
+        перевищує 2**53. Інші типи цін (наприклад, Decimal) не підтримуються.
+
+        :return: True, якщо можна використати векторний розрахунок.
+        """
+        int_prices = []
+        for product in self.products:
+            if isinstance(product.price, bool) or not isinstance(product.price, (int, float)):
+                return False
+            if isinstance(product.price, int):
+                int_prices.append(abs(product.price))
+        if not int_prices:
+            return True
+        max_quantity = self._row_sums(np.abs(self.quantities)).max(initial=0)
+        return max(int_prices) * int(max_quantity) < FLOAT_EXACT_INT_LIMIT
+
+
+def scalar_totals(carts, discounts=None, decimals=None):
+    """
+    Обчислює суми кошиків звичайною арифметикою Python у типі цін товарів.
+
+    :param carts: Послідовність ShoppingCart.
+    :param discounts: Необов'язковий словник {Product: частка знижки від 0 до 1}.
+    :param decimals: Кількість знаків для округлення валюти або None.
+    :return: Масив сум (dtype=object) у порядку кошиків.
+    """
+    discounts = discounts or {}
+    totals = []
+    for cart in carts:
+        total = 0
+        for product, count in cart.products.items():
+            price = product.price
+            rate = discounts.get(product, 0)
+            if rate:
+                price = price * (1 - (Decimal(str(rate)) if isinstance(price, Decimal) else rate))
+            total += price * count
+        totals.append(total if decimals is None else round(total, decimals))
+    result = np.empty(len(totals), dtype=object)
+    result[:] = totals
+    return result
+
+
+def calculate_totals(carts, discounts=None, decimals=None):
+    """
+    Обчислює суми багатьох кошиків однією векторною операцією.
+
+    Ціни, які float64 не представляє точно (Decimal, великі цілі), рахуються
+    скалярно, щоб результат збігався з ShoppingCart.calculate_total.
+
+    :param carts: Послідовність ShoppingCart.
+    :param discounts: Необов'язковий словник {Product: частка знижки від 0 до 1}.
+    :param decimals: Кількість знаків для округлення валюти або None.
+    :return: Масив сум у порядку кошиків.
+    """
+    matrix = CartMatrix.from_carts(carts)
+    if not matrix.is_float_exact():
+        return scalar_totals(carts, discounts, decimals)
+    totals = matrix.totals(matrix.price_vector(discounts))
+    if decimals is not None:
+        totals = np.round(totals, decimals)
+    return totals
@@ -0,0 +1,144 @@
+"""Пакетне оновлення цін і залишків з інкрементальною перевіркою кошиків."""
+
+import weakref
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ProductUpdate:
+    """Зміна ціни та/або поповнення запасу одного товару."""
+
+    product: object
+    price: float = None
+    restock: int = 0
+
+
+@dataclass
+class CartRevalidation:
+    """Результат повторної перевірки кошика після оновлень."""
+
+    cart: object
+    old_total: float
+    new_total: float
+    unavailable: list = field(default_factory=list)
+
+    @property
+    def total_changed(self):
+        """Чи змінилася сума кошика."""
+        return self.old_total != self.new_total
+
+
+class CartRegistry:
+    """Зворотний індекс товар → кошики, що його містять."""
+
+    def __init__(self):
+        """Створює порожній реєстр."""
+        self._carts_by_product = {}
+
+    def register(self, cart):
+        """
+        Підключає кошик до реєстру та індексує його поточний вміст.
+
+        :param cart: ShoppingCart.
+        """
+        cart.registry = self
+        for product in cart.products:
+            self.line_added(cart, product)
+
+    def line_added(self, cart, product):
+        """
+        Фіксує, що кошик містить товар.
+
+        :param cart: ShoppingCart.
+        :param product: Товар.
+        """
+        self._carts_by_product.setdefault(product.name, weakref.WeakSet()).add(cart)
+
+    def line_removed(self, cart, product):
+        """
+        Фіксує, що товар більше не в кошику.
+
+        :param cart: ShoppingCart.
+        :param product: Товар.
+        """
+        carts = self._carts_by_product.get(product.name)
+        if carts is not None:
+            carts.discard(cart)
+            if not carts:
+                del self._carts_by_product[product.name]
+
+    def carts_with(self, product):
+        """
+        Повертає кошики, що містять товар.
+
+        :param product: Товар.
+        :return: Список кошиків.
+        """
+        return list(self._carts_by_product.get(product.name, ()))
+
+    @staticmethod
+    def revalidate(cart, old_total, changed_products=None):
+        """
+        Перераховує суму кошика й перевіряє наявність змінених товарів.
+
+        :param cart: ShoppingCart.
+        :param old_total: Сума кошика до оновлень.
+        :param changed_products: Товари, наявність яких треба перевірити (усі, якщо None).
+        :return: CartRevalidation.
+        """
+        products = cart.products if changed_products is None else [p for p in changed_products if p in cart.products]
+        unavailable = [product for product in products if not product.is_available(cart.products[product])]
+        return CartRevalidation(cart, old_total, cart.calculate_total(), unavailable)
+
+
+def apply_price_and_stock_updates(updates, registry=None):
+    """
+    Застосовує пакет змін цін і залишків та перевіряє лише зачеплені кошики.
+
+    Усі зміни спершу валідуються; якщо хоч одна некоректна, жоден товар не змінюється.
+
+    :param updates: Ітерований набір ProductUpdate.
+    :param registry: CartRegistry для пошуку зачеплених кошиків.
+    :return: Список CartRevalidation для кошиків зі зміненою сумою або недоступними товарами.
+    :raises ValueError: Якщо ціна не додатна або поповнення від'ємне.
+    """
+    updates = list(updates)
+    errors = []
+    for update in updates:
+        if update.price is not None and update.price <= 0:
+            errors.append(f"{update.product}: price must be greater than zero")
+        if update.restock < 0:
+            errors.append(f"{update.product}: restock amount must not be negative")
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    affected = {}
+    if registry is not None:
+        for update in updates:
+            for cart in registry.carts_with(update.product):
+                affected.setdefault(id(cart), (cart, cart.calculate_total(), []))
+    changed = {}
+    for update in updates:
+        product = update.product
+        version = product.version
+        if update.price is not None and update.price != product.price:
+            product.update_price(update.price)
+        if update.restock:
+            product.restock(update.restock)
+        if product.version != version:
+            changed[product.name] = product
+
+    if registry is None:
+        return []
+    for product in changed.values():
+        for cart in registry.carts_with(product):
+            affected[id(cart)][2].append(product)
+
+    results = []
+    for cart, old_total, products in affected.values():
+        if not products:
+            continue
+        result = registry.revalidate(cart, old_total, products)
+        if result.total_changed or result.unavailable:
+            results.append(result)
+    return results
@@ -0,0 +1,135 @@
+"""Спільний між процесами склад на основі multiprocessing.shared_memory."""
+
+import multiprocessing
+import sys
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+COUNTER_SIZE = 8
+
+
+class SharedInventory:
+    """
+    Масив лічильників залишків у спільній пам'яті з індексом назва → слот.
+
+    Зміни захищені смугастими блокуваннями multiprocessing, тож списання є атомарним
+    між процесами без звернення до окремого сервера. Об'єкт передається дочірнім
+    процесам як аргумент multiprocessing.Process.
+    """
+
+    def __init__(self, stock, lock_stripes=64, context=None):
+        """
+        Створює сегмент спільної пам'яті з початковими залишками.
+
+        :param stock: Словник {назва товару: кількість}.
+        :param lock_stripes: Кількість блокувань, між якими розподіляються слоти.
+        :param context: Контекст multiprocessing для створення блокувань.
+        """
+        context = context or multiprocessing
+        self._index = {name: slot for slot, name in enumerate(stock)}
+        self._shm = shared_memory.SharedMemory(create=True, size=max(COUNTER_SIZE, COUNTER_SIZE * len(stock)))
+        self._counters = self._shm.buf.cast("q")
+        for name, slot in self._index.items():
+            self._counters[slot] = stock[name]
+        self._locks = [context.RLock() for _ in range(lock_stripes)]
+        self._owner = True
+
+    @classmethod
+    def from_products(cls, products, **kwargs):
+        """
+        Створює спільний склад з переліку товарів і підключає їх до нього.
+
+        :param products: Перелік Product.
+        :return: SharedInventory.
+        """
+        products = list(products)
+        inventory = cls({product.name: product.available_amount for product in products}, **kwargs)
+        for product in products:
+            product.inventory = inventory
+        return inventory
+
+    def __getstate__(self):
+        return {"name": self._shm.name, "index": self._index, "locks": self._locks}
+
+    def __setstate__(self, state):
+        self._index = state["index"]
+        self._locks = state["locks"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        if sys.version_info < (3, 13):
+            from multiprocessing import resource_tracker  # pylint: disable=import-outside-toplevel
+            resource_tracker.unregister(self._shm._name, "shared_memory")  # pylint: disable=protected-access
+        self._counters = self._shm.buf.cast("q")
+        self._owner = False
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def get(self, name):
+        """
+        Повертає поточний залишок товару.
+
+        :param name: Назва товару.
+        :return: Кількість.
+        """
+        return self._counters[self._index[name]]
+
+    def decrement(self, name, amount):
+        """
+        Атомарно списує кількість, лише якщо її достатньо.
+
+        :param name: Назва товару.
+        :param amount: Кількість для списання.
+        :return: Залишок після списання.
+        :raises ValueError: Якщо товару недостатньо.
+        """
+        slot = self._index[name]
+        with self._lock_for(slot):
+            available = self._counters[slot]
+            if available < amount:
+                raise ValueError(f"Product {name} has only {available} items")
+            self._counters[slot] = available - amount
+            return available - amount
+
+    def increment(self, name, amount):
+        """
+        Атомарно збільшує залишок.
+
+        :param name: Назва товару.
+        :param amount: Кількість.
+        :return: Залишок після зміни.
+        """
+        slot = self._index[name]
+        with self._lock_for(slot):
+            self._counters[slot] += amount
+            return self._counters[slot]
+
+    @contextmanager
+    def locked(self, names):
+        """
+        Утримує блокування всіх переданих товарів для узгодженої багаторядкової операції.
+
+        :param names: Назви товарів.
+        """
+        stripes = sorted({self._index[name] % len(self._locks) for name in names})
+        acquired = []
+        try:
+            for stripe in stripes:
+                self._locks[stripe].acquire()
+                acquired.append(stripe)
+            yield self
+        finally:
+            for stripe in reversed(acquired):
+                self._locks[stripe].release()
+
+    def close(self):
+        """Від'єднує поточний процес від спільної пам'яті."""
+        self._counters.release()
+        self._shm.close()
+
+    def unlink(self):
+        """Звільняє сегмент спільної пам'яті (викликає процес-власник)."""
+        if self._owner:
+            self._shm.unlink()
+
+    def _lock_for(self, slot):
+        return self._locks[slot % len(self._locks)]
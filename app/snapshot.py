@@ -0,0 +1,175 @@
+"""Компактні бінарні знімки кошиків з лінивим відновленням через mmap."""
+
+import mmap
+import os
+import struct
+
+from .eshop import ShoppingCart
+
+MAGIC = b"CART"
+VERSION = 1
+HEADER = struct.Struct("<4sHIIIQQQQ")
+CART_RECORD = struct.Struct("<IIII")
+LINE_RECORD = struct.Struct("<IId")
+PRODUCT_RECORD = struct.Struct("<II")
+
+
+def save_carts(path, carts):
+    """
+    Зберігає всі активні кошики в один файл фіксованого формату.
+
+    Кошики впорядковуються за ідентифікатором, щоб відновлення могло шукати їх
+    бінарним пошуком без розбору всього файлу.
+
+    :param path: Шлях до файлу знімка.
+    :param carts: Словник {cart_id: ShoppingCart}.
+    :return: Кількість збережених кошиків.
+    """
+    strings = bytearray()
+    product_indexes = {}
+    product_records = []
+    cart_records = []
+    line_records = []
+
+    def add_string(value):
+        encoded = value.encode("utf-8")
+        offset = len(strings)
+        strings.extend(encoded)
+        return offset, len(encoded)
+
+    for cart_id in sorted(carts, key=lambda key: key.encode("utf-8")):
+        cart = carts[cart_id]
+        id_offset, id_length = add_string(cart_id)
+        cart_records.append((id_offset, id_length, len(line_records), len(cart.products)))
+        for product, quantity in cart.products.items():
+            name = str(product)
+            if name not in product_indexes:
+                product_indexes[name] = len(product_records)
+                product_records.append(add_string(name))
+            price = cart.added_prices.get(product, product.price)
+            line_records.append((product_indexes[name], quantity, price))
+
+    cart_offset = HEADER.size
+    line_offset = cart_offset + CART_RECORD.size * len(cart_records)
+    product_offset = line_offset + LINE_RECORD.size * len(line_records)
+    strings_offset = product_offset + PRODUCT_RECORD.size * len(product_records)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(HEADER.pack(
+            MAGIC, VERSION, len(cart_records), len(line_records), len(product_records),
+            cart_offset, line_offset, product_offset, strings_offset,
+        ))
+        snapshot_file.write(b"".join(CART_RECORD.pack(*record) for record in cart_records))
+        snapshot_file.write(b"".join(LINE_RECORD.pack(*record) for record in line_records))
+        snapshot_file.write(b"".join(PRODUCT_RECORD.pack(*record) for record in product_records))
+        snapshot_file.write(strings)
+    os.replace(tmp_path, path)
+    return len(cart_records)
+
+
+class CartSnapshot:
+    """Знімок кошиків, відображений у пам'ять; кошики розбираються лише на вимогу."""
+
+    def __init__(self, path):
+        """
+        Відкриває знімок і перевіряє заголовок.
+
+        :param path: Шлях до файлу знімка.
+        :raises ValueError: Якщо файл не є знімком кошиків підтримуваної версії.
+        """
+        with open(path, "rb") as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.cart_count, self.line_count, self.product_count,
+         self._cart_offset, self._line_offset, self._product_offset, self._strings_offset) = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a cart snapshot of version {VERSION}")
+
+    def __len__(self):
+        return self.cart_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Звільняє відображення файлу."""
+        self._mmap.close()
+
+    def cart_ids(self):
+        """
+        Ліниво перебирає ідентифікатори кошиків у порядку зберігання.
+
+        :return: Генератор ідентифікаторів.
+        """
+        for index in range(self.cart_count):
+            yield self._cart_id(index).decode("utf-8")
+
+    def load(self, cart_id, catalog):
+        """
+        Відновлює один кошик за ідентифікатором.
+
+        :param cart_id: Ідентифікатор кошика.
+        :param catalog: Словник {назва товару: Product}.
+        :return: ShoppingCart або None, якщо кошика немає у знімку.
+        :raises ValueError: Якщо товару з кошика немає в каталозі.
+        """
+        index = self._find(cart_id.encode("utf-8"))
+        if index is None:
+            return None
+        return self._load_index(index, catalog)
+
+    def load_all(self, catalog):
+        """
+        Ліниво відновлює всі кошики.
+
+        :param catalog: Словник {назва товару: Product}.
+        :return: Генератор пар (cart_id, ShoppingCart).
+        """
+        for index in range(self.cart_count):
+            yield self._cart_id(index).decode("utf-8"), self._load_index(index, catalog)
+
+    def _load_index(self, index, catalog):
+        _, _, first_line, line_count = CART_RECORD.unpack_from(
+            self._mmap, self._cart_offset + index * CART_RECORD.size
+        )
+        cart = ShoppingCart()
+        for line in range(first_line, first_line + line_count):
+            product_index, quantity, price = LINE_RECORD.unpack_from(
+                self._mmap, self._line_offset + line * LINE_RECORD.size
+            )
+            name = self._product_name(product_index)
+            if name not in catalog:
+                raise ValueError(f"Product {name} is not in the catalog")
+            product = catalog[name]
+            cart.products[product] = quantity
+            cart.added_prices[product] = price
+        return cart
+
+    def _find(self, encoded_id):
+        low, high = 0, self.cart_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._cart_id(middle) < encoded_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.cart_count and self._cart_id(low) == encoded_id:
+            return low
+        return None
+
+    def _cart_id(self, index):
+        id_offset, id_length, _, _ = CART_RECORD.unpack_from(self._mmap, self._cart_offset + index * CART_RECORD.size)
+        start = self._strings_offset + id_offset
+        return self._mmap[start:start + id_length]
+
+    def _product_name(self, product_index):
+        name_offset, name_length = PRODUCT_RECORD.unpack_from(
+            self._mmap, self._product_offset + product_index * PRODUCT_RECORD.size
+        )
+        start = self._strings_offset + name_offset
+        return self._mmap[start:start + name_length].decode("utf-8")
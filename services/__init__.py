@@ -1 +1,5 @@
-from .service import ShippingService
\ No newline at end of file
+from .service import ShippingService
+from .cache import StatusCache
+from .consumer import CarrierConsumerPool
+from .counters import ShardedCounters
+from .admission import AdmissionController, OverloadedError
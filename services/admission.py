@@ -0,0 +1,136 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from .config import (
+    ADMISSION_INITIAL_LIMIT, ADMISSION_MIN_LIMIT, ADMISSION_MAX_LIMIT, ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS, ADMISSION_TARGET_LATENCY_SECONDS,
+)
+
+
+class OverloadedError(RuntimeError):
+    retryable: bool = True
+
+    def __init__(self, message, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionSlot:
+    # A slot acquired on one thread and released on another, e.g. by a background task.
+    def __init__(self, controller):
+        self.controller = controller
+        self.started = time.monotonic()
+        self._released = False
+
+    def __enter__(self):
+        local = self.controller._local
+        local.depth = getattr(local, "depth", 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.controller._local.depth -= 1
+        self.release(failed=exc_type is not None)
+
+    def release(self, failed: bool = False):
+        if not self._released:
+            self._released = True
+            self.controller._release(self.started, time.monotonic(), failed)
+
+
+class AdmissionController:
+    DECREASE_RATIO: float = 0.9
+
+    def __init__(self, initial_limit: int = ADMISSION_INITIAL_LIMIT, min_limit: int = ADMISSION_MIN_LIMIT,
+                 max_limit: int = ADMISSION_MAX_LIMIT, max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                 target_latency: float = ADMISSION_TARGET_LATENCY_SECONDS):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._last_decrease_at = float("-inf")
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+    @contextmanager
+    def admit(self):
+        if getattr(self._local, "depth", 0):
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        self._acquire()
+        self._local.depth = 1
+        started = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._local.depth = 0
+            self._release(started, time.monotonic(), failed)
+
+    def acquire(self):
+        self._acquire()
+        return AdmissionSlot(self)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
+
+    def _acquire(self):
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self._take()
+                return
+            if self.waiting >= self.max_queue:
+                self._reject("Admission queue is full")
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.in_flight >= int(self.limit):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("Timed out waiting for admission")
+                    self._condition.wait(remaining)
+                self._take()
+            finally:
+                self.waiting -= 1
+
+    def _take(self):
+        self.in_flight += 1
+        self.admitted += 1
+
+    def _reject(self, message):
+        self.rejected += 1
+        raise OverloadedError(f"{message}, try again later", retry_after=self.target_latency)
+
+    def _release(self, started, finished, failed: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            if finished - started > self.target_latency:
+                # Requests admitted before the last decrease saw the same overload, so they must not cut again.
+                if started >= self._last_decrease_at:
+                    self.limit = max(self.min_limit, self.limit * self.DECREASE_RATIO)
+                    self._last_decrease_at = finished
+            elif not failed:
+                # A call that failed fast says nothing about spare capacity, so it must not raise the limit.
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify(max(1, int(self.limit) - self.in_flight))
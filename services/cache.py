@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+from .config import STATUS_CACHE_TTL_SECONDS, STATUS_CACHE_MAX_SIZE
+
+
+class StatusCache:
+    def __init__(self, ttl_seconds: float = STATUS_CACHE_TTL_SECONDS,
+                 max_size: int = STATUS_CACHE_MAX_SIZE, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.clock = clock
+        self._items = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, shipping_id):
+        with self._lock:
+            entry = self._items.get(shipping_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            status, expires_at = entry
+            if expires_at <= self.clock():
+                del self._items[shipping_id]
+                self.misses += 1
+                return None
+            self._items.move_to_end(shipping_id)
+            self.hits += 1
+            return status
+
+    def put(self, shipping_id, status):
+        with self._lock:
+            self._loading.pop(shipping_id, None)
+            self._store(shipping_id, status)
+
+    def invalidate(self, shipping_id):
+        with self._lock:
+            self._loading.pop(shipping_id, None)
+            self._items.pop(shipping_id, None)
+
+    def get_or_load(self, shipping_id, loader):
+        status = self.get(shipping_id)
+        if status is None:
+            status = self.load_many([shipping_id], lambda ids: {shipping_id: loader(shipping_id)})[shipping_id]
+        return status
+
+    def load_many(self, shipping_ids, loader):
+        # A load that overlaps invalidate()/put() read a status that may already be outdated, so it is not cached.
+        tokens = {}
+        with self._lock:
+            for shipping_id in shipping_ids:
+                tokens[shipping_id] = self._loading[shipping_id] = object()
+        loaded = {}
+        try:
+            loaded = loader(shipping_ids)
+        finally:
+            with self._lock:
+                for shipping_id, token in tokens.items():
+                    if self._loading.get(shipping_id) is not token:
+                        continue
+                    del self._loading[shipping_id]
+                    if loaded.get(shipping_id) is not None:
+                        self._store(shipping_id, loaded[shipping_id])
+        return {shipping_id: loaded.get(shipping_id) for shipping_id in shipping_ids}
+
+    def _store(self, shipping_id, status):
+        self._items[shipping_id] = (status, self.clock() + self.ttl_seconds)
+        self._items.move_to_end(shipping_id)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._loading.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._items),
+            }
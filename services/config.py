@@ -1,6 +1,78 @@
+import json
 import os
 
 AWS_ENDPOINT_URL = os.getenv("AWS_ENDPOINT_URL", "http://localhost:4566")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 SHIPPING_TABLE_NAME = os.getenv("SHIPPING_TABLE_NAME", "ShippingTable")
 SHIPPING_QUEUE = os.getenv("SHIPPING_QUEUE_NAME", "ShippingQueue")
+SHIPPING_COUNTERS_TABLE_NAME = os.getenv("SHIPPING_COUNTERS_TABLE_NAME", "ShippingCounters")
+SHIPPING_NAMESPACE = os.getenv("SHIPPING_NAMESPACE", "")
+
+
+def namespaced(name: str, namespace: str = SHIPPING_NAMESPACE) -> str:
+    return f"{namespace}-{name}" if namespace else name
+
+CARRIER_QUEUES = json.loads(os.getenv("CARRIER_QUEUES", "null")) or {
+    "Нова Пошта": f"{SHIPPING_QUEUE}-NovaPoshta",
+    "Укр Пошта": f"{SHIPPING_QUEUE}-UkrPoshta",
+    "Meest Express": f"{SHIPPING_QUEUE}-MeestExpress",
+    "Самовивіз": f"{SHIPPING_QUEUE}-Pickup",
+}
+CARRIER_WORKERS = json.loads(os.getenv("CARRIER_WORKERS", "{}"))
+DEFAULT_CARRIER_WORKERS = int(os.getenv("DEFAULT_CARRIER_WORKERS", "1"))
+
+STATUS_CACHE_TTL_SECONDS = float(os.getenv("STATUS_CACHE_TTL_SECONDS", "5"))
+STATUS_CACHE_MAX_SIZE = int(os.getenv("STATUS_CACHE_MAX_SIZE", "10000"))
+
+WAIT_INITIAL_DELAY_SECONDS = float(os.getenv("WAIT_INITIAL_DELAY_SECONDS", "0.1"))
+WAIT_MAX_DELAY_SECONDS = float(os.getenv("WAIT_MAX_DELAY_SECONDS", "5"))
+
+AWS_RATE_LIMIT_PER_SECOND = float(os.getenv("AWS_RATE_LIMIT_PER_SECOND", "100"))
+AWS_RATE_LIMIT_BURST = float(os.getenv("AWS_RATE_LIMIT_BURST", "200"))
+AWS_RATE_LIMIT_MIN_PER_SECOND = float(os.getenv("AWS_RATE_LIMIT_MIN_PER_SECOND", "1"))
+AWS_RETRY_MAX_ATTEMPTS = int(os.getenv("AWS_RETRY_MAX_ATTEMPTS", "5"))
+AWS_RETRY_BASE_DELAY_SECONDS = float(os.getenv("AWS_RETRY_BASE_DELAY_SECONDS", "0.05"))
+AWS_RETRY_MAX_DELAY_SECONDS = float(os.getenv("AWS_RETRY_MAX_DELAY_SECONDS", "2"))
+AWS_OPERATION_DEADLINE_SECONDS = float(os.getenv("AWS_OPERATION_DEADLINE_SECONDS", "10"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT_SECONDS = float(os.getenv("CIRCUIT_RESET_TIMEOUT_SECONDS", "30"))
+
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "20"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "1"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "200"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "50"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "1"))
+ADMISSION_TARGET_LATENCY_SECONDS = float(os.getenv("ADMISSION_TARGET_LATENCY_SECONDS", "0.5"))
+
+RECONCILE_STUCK_AFTER_MINUTES = float(os.getenv("RECONCILE_STUCK_AFTER_MINUTES", "30"))
+RECONCILE_TOTAL_SEGMENTS = int(os.getenv("RECONCILE_TOTAL_SEGMENTS", "4"))
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "25"))
+
+SHIPPING_TTL_ATTRIBUTE = os.getenv("SHIPPING_TTL_ATTRIBUTE", "expires_at")
+SHIPPING_EXPORTED_ATTRIBUTE = os.getenv("SHIPPING_EXPORTED_ATTRIBUTE", "exported_at")
+SHIPPING_RETENTION_DAYS = float(os.getenv("SHIPPING_RETENTION_DAYS", "30"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "50000"))
+
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "8"))
+
+SHIPPING_PACKED_MESSAGES = os.getenv("SHIPPING_PACKED_MESSAGES", "0") == "1"
+SHIPPING_PACK_MAX_BYTES = int(os.getenv("SHIPPING_PACK_MAX_BYTES", "250000"))
+# One poll returns up to 10 packs and every id costs DynamoDB round trips; keep a batch well inside the
+# queue's visibility timeout so other consumers do not receive the same packs again.
+SHIPPING_PACK_MAX_IDS = int(os.getenv("SHIPPING_PACK_MAX_IDS", "50"))
+SHIPPING_PACK_LINGER_SECONDS = float(os.getenv("SHIPPING_PACK_LINGER_SECONDS", "0.05"))
+SHIPPING_MAX_RECEIVE_COUNT = int(os.getenv("SHIPPING_MAX_RECEIVE_COUNT", "5"))
+
+COUNTER_SHARDS = int(os.getenv("COUNTER_SHARDS", "16"))
+COUNTER_CACHE_TTL_SECONDS = float(os.getenv("COUNTER_CACHE_TTL_SECONDS", "2"))
+COUNTER_READ_WORKERS = int(os.getenv("COUNTER_READ_WORKERS", "4"))
+COUNTER_FLUSH_INTERVAL_SECONDS = float(os.getenv("COUNTER_FLUSH_INTERVAL_SECONDS", "1"))
+COUNTER_WRITE_DEADLINE_SECONDS = float(os.getenv("COUNTER_WRITE_DEADLINE_SECONDS", "0.5"))
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_ON_START = os.getenv("PROFILE_ON_START", "0") == "1"
+PROFILE_SIGNAL = os.getenv("PROFILE_SIGNAL", "SIGUSR2")
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "profiles")
+PROFILE_WINDOW_SECONDS = float(os.getenv("PROFILE_WINDOW_SECONDS", "30"))
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.005"))
+PROFILE_TOP_ALLOCATIONS = int(os.getenv("PROFILE_TOP_ALLOCATIONS", "25"))
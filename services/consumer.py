@@ -0,0 +1,79 @@
+import threading
+from collections import defaultdict
+
+from .config import CARRIER_WORKERS, DEFAULT_CARRIER_WORKERS
+
+
+class CarrierConsumerPool:
+    ERROR_BACKOFF_SECONDS: float = 1.0
+
+    def __init__(self, shipping_service, carrier_workers: dict = None,
+                 default_workers: int = DEFAULT_CARRIER_WORKERS):
+        self.shipping_service = shipping_service
+        workers = CARRIER_WORKERS if carrier_workers is None else carrier_workers
+        self.carrier_workers = {
+            shipping_type: int(workers.get(shipping_type, default_workers))
+            for shipping_type in shipping_service.carrier_publishers
+        }
+        self.processed = defaultdict(int)
+        self.errors = defaultdict(int)
+        self._next_carrier = 0
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def run_once(self):
+        carriers = list(self.carrier_workers)
+        if not carriers:
+            return {}
+        start = self._next_carrier % len(carriers)
+        self._next_carrier += 1
+
+        results = {}
+        for shipping_type in carriers[start:] + carriers[:start]:
+            results[shipping_type] = self._process_batch(shipping_type)
+        return results
+
+    def start(self):
+        self._stop_event.clear()
+        for shipping_type, workers in self.carrier_workers.items():
+            for number in range(workers):
+                thread = threading.Thread(
+                    target=self._work, args=(shipping_type,),
+                    name=f"shipping-consumer-{shipping_type}-{number}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self):
+        with self._lock:
+            return {
+                shipping_type: {
+                    "workers": workers,
+                    "processed": self.processed[shipping_type],
+                    "errors": self.errors[shipping_type],
+                }
+                for shipping_type, workers in self.carrier_workers.items()
+            }
+
+    def _work(self, shipping_type):
+        while not self._stop_event.is_set():
+            if self._process_batch(shipping_type) is None:
+                self._stop_event.wait(self.ERROR_BACKOFF_SECONDS)
+
+    def _process_batch(self, shipping_type):
+        try:
+            result = self.shipping_service.process_shipping_batch(shipping_type)
+        except Exception:  # pylint: disable=broad-except
+            with self._lock:
+                self.errors[shipping_type] += 1
+            return None
+        with self._lock:
+            self.processed[shipping_type] += len(result)
+        return result
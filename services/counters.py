@@ -0,0 +1,149 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import (
+    COUNTER_SHARDS, COUNTER_CACHE_TTL_SECONDS, COUNTER_READ_WORKERS, COUNTER_FLUSH_INTERVAL_SECONDS,
+    COUNTER_WRITE_DEADLINE_SECONDS, SHIPPING_NAMESPACE,
+)
+from .db import get_dynamodb_resource, counters_table_name
+from .profiling import profiled
+from .resilience import get_resilient_caller
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedCounters:
+    BATCH_GET_LIMIT: int = 100
+    BATCH_GET_MAX_RETRIES: int = 5
+
+    def __init__(self, shards: int = COUNTER_SHARDS, cache_ttl_seconds: float = COUNTER_CACHE_TTL_SECONDS,
+                 read_workers: int = COUNTER_READ_WORKERS, flush_interval: float = COUNTER_FLUSH_INTERVAL_SECONDS,
+                 resilience=None, namespace: str = SHIPPING_NAMESPACE, clock=time.monotonic):
+        self.shards = shards
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.read_workers = read_workers
+        self.flush_interval = flush_interval
+        self.clock = clock
+        # A separate caller, so throttling or errors on the counters table never slow down or trip the shipping calls.
+        self.resilience = resilience or get_resilient_caller(
+            "dynamodb-counters", max_attempts=1, deadline=COUNTER_WRITE_DEADLINE_SECONDS
+        )
+        self.dynamo_resource = get_dynamodb_resource()
+        self.table = self.dynamo_resource.Table(counters_table_name(namespace))
+        self._cache = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stopped = threading.Event()
+        self.write_errors = 0
+
+    def shard_key(self, key: str, shard: int):
+        return f"{key}#{shard}"
+
+    @profiled
+    def increment(self, key: str, amount: int = 1):
+        # A random shard spreads writes to one logical counter over many partitions.
+        self.resilience.call(
+            self.table.update_item,
+            Key={"counter_key": self.shard_key(key, random.randrange(self.shards))},
+            UpdateExpression="ADD #count :amount",
+            ExpressionAttributeNames={"#count": "count"},
+            ExpressionAttributeValues={":amount": amount},
+        )
+
+    def record(self, *keys: str):
+        # Counters are for dashboards: shipping transitions only add to an in-memory delta,
+        # and a background thread writes the deltas, so a slow counters table never delays an order.
+        with self._lock:
+            for key in keys:
+                self._pending[key] = self._pending.get(key, 0) + 1
+            if self._flusher is None:
+                # Started lazily, and again after close(), the same way the service re-creates its pools.
+                self._stopped = threading.Event()
+                self._flusher = threading.Thread(
+                    target=self._flush_periodically, args=(self._stopped,), name="counter-flusher", daemon=True
+                )
+                self._flusher.start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for key, amount in pending.items():
+            try:
+                self.increment(key, amount)
+            except Exception:  # pylint: disable=broad-except
+                with self._lock:
+                    self.write_errors += 1
+                    self._pending[key] = self._pending.get(key, 0) + amount
+
+    def close(self):
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+            self._stopped.set()
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        self.flush()
+        with self._lock:
+            unwritten = dict(self._pending)
+        if unwritten:
+            logger.warning("%d counter deltas could not be written on close: %s", len(unwritten), unwritten)
+        return unwritten
+
+    def _flush_periodically(self, stopped):
+        while not stopped.wait(self.flush_interval):
+            self.flush()
+
+    @profiled
+    def read(self, keys: list):
+        now = self.clock()
+        totals = {}
+        missing_keys = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._cache.get(key)
+                if entry is not None and entry[1] > now:
+                    totals[key] = entry[0]
+                else:
+                    missing_keys.append(key)
+
+        if missing_keys:
+            loaded = self._load(missing_keys)
+            expires_at = self.clock() + self.cache_ttl_seconds
+            with self._lock:
+                for key in missing_keys:
+                    totals[key] = loaded.get(key, 0)
+                    self._cache[key] = (totals[key], expires_at)
+
+        return totals
+
+    def _load(self, keys: list):
+        shard_keys = {self.shard_key(key, shard): key for key in keys for shard in range(self.shards)}
+        chunks = [list(shard_keys)[start:start + self.BATCH_GET_LIMIT]
+                  for start in range(0, len(shard_keys), self.BATCH_GET_LIMIT)]
+        totals = {}
+        with ThreadPoolExecutor(min(self.read_workers, len(chunks))) as executor:
+            for items in executor.map(self._batch_get, chunks):
+                for item in items:
+                    key = shard_keys[item["counter_key"]]
+                    totals[key] = totals.get(key, 0) + int(item["count"])
+        return totals
+
+    def _batch_get(self, shard_keys):
+        table_name = self.table.name
+        request = {table_name: {"Keys": [{"counter_key": shard_key} for shard_key in shard_keys]}}
+        items = []
+        for attempt in range(self.BATCH_GET_MAX_RETRIES + 1):
+            response = self.resilience.call(self.dynamo_resource.batch_get_item, RequestItems=request)
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                return items
+            time.sleep(min(0.05 * 2 ** attempt, 1.0))
+        raise RuntimeError(f"Could not read {len(request[table_name]['Keys'])} counter shards after retries")
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
@@ -1,5 +1,6 @@
 import boto3
-from .config import AWS_ENDPOINT_URL, AWS_REGION
+from .config import AWS_ENDPOINT_URL, AWS_REGION, SHIPPING_TABLE_NAME, SHIPPING_COUNTERS_TABLE_NAME, SHIPPING_NAMESPACE, namespaced
+from .resilience import BOTO_CONFIG
 
 def get_dynamodb_resource():
     return boto3.resource(
@@ -8,5 +9,24 @@ def get_dynamodb_resource():
         region_name=AWS_REGION,
         aws_access_key_id="test",
         aws_secret_access_key="test",
+        config=BOTO_CONFIG,
     )
 
+
+def get_dynamodb_client():
+    return boto3.client(
+        "dynamodb",
+        endpoint_url=AWS_ENDPOINT_URL,
+        region_name=AWS_REGION,
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        config=BOTO_CONFIG,
+    )
+
+
+def shipping_table_name(namespace: str = SHIPPING_NAMESPACE):
+    return namespaced(SHIPPING_TABLE_NAME, namespace)
+
+
+def counters_table_name(namespace: str = SHIPPING_NAMESPACE):
+    return namespaced(SHIPPING_COUNTERS_TABLE_NAME, namespace)
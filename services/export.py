@@ -0,0 +1,158 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from boto3.dynamodb.conditions import Attr
+
+from .config import RECONCILE_TOTAL_SEGMENTS, EXPORT_CHUNK_SIZE, SHIPPING_EXPORTED_ATTRIBUTE
+from .repository import ShippingRepository
+from .profiling import install_from_env
+
+EXPORT_COLUMNS = [
+    "shipping_id", "shipping_type", "order_id", "product_ids", "shipping_status",
+    "created_date", "due_date", "expires_at",
+]
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot serialize {type(value)}")
+
+
+class JsonLinesChunkWriter:
+    extension = "jsonl.gz"
+
+    def __init__(self, path):
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def write(self, item):
+        self._file.write(json.dumps(item, ensure_ascii=False, default=_json_default))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetChunkWriter:
+    extension = "parquet"
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel
+            import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise RuntimeError("Parquet export requires the pyarrow package") from error
+        self._pyarrow = pyarrow
+        self._path = path
+        self._columns = {column: [] for column in EXPORT_COLUMNS}
+
+    def write(self, item):
+        for column, values in self._columns.items():
+            value = item.get(column)
+            values.append(_json_default(value) if isinstance(value, Decimal) else value)
+
+    def close(self):
+        table = self._pyarrow.table(self._columns)
+        self._pyarrow.parquet.write_table(table, self._path, compression="zstd")
+
+
+EXPORT_FORMATS = {"jsonl": JsonLinesChunkWriter, "parquet": ParquetChunkWriter}
+
+
+class ShippingExporter:
+    def __init__(self, repository, output_dir: str, export_format: str = "jsonl",
+                 total_segments: int = RECONCILE_TOTAL_SEGMENTS, chunk_size: int = EXPORT_CHUNK_SIZE,
+                 run_id: str = None, include_exported: bool = False):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}")
+        self.repository = repository
+        self.output_dir = output_dir
+        self.writer_class = EXPORT_FORMATS[export_format]
+        self.total_segments = total_segments
+        self.chunk_size = chunk_size
+        # TTL may already have removed archived items from the table, so a rerun must never overwrite a past run.
+        self.run_id = run_id or f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid4().hex[:8]}"
+        self.include_exported = include_exported
+        self.exported_at = datetime.now(timezone.utc).isoformat()
+        self.stats = defaultdict(int)
+        self._stats_lock = threading.Lock()
+
+    def run(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.total_segments) as executor:
+            files = list(executor.map(self.export_segment, range(self.total_segments)))
+        return [path for segment_files in files for path in segment_files]
+
+    def export_segment(self, segment: int):
+        export_filter = Attr("shipping_status").is_in(list(self.repository.TERMINAL_STATUSES))
+        if not self.include_exported:
+            # Items exported by an earlier run carry a watermark and are skipped.
+            export_filter &= Attr(SHIPPING_EXPORTED_ATTRIBUTE).not_exists()
+        files = []
+        writer = None
+        written_ids = []
+        try:
+            for items, _ in self.repository.scan_segment(segment, self.total_segments,
+                                                         filter_expression=export_filter):
+                for item in items:
+                    if writer is None or len(written_ids) >= self.chunk_size:
+                        if writer is not None:
+                            finished, writer = writer, None
+                            self._finish_chunk(finished, written_ids)
+                        path = os.path.join(
+                            self.output_dir,
+                            f"shipments-{self.run_id}-{segment:04d}-{len(files):05d}.{self.writer_class.extension}"
+                        )
+                        writer = self.writer_class(path)
+                        files.append(path)
+                        written_ids = []
+                    writer.write(item)
+                    written_ids.append(item["shipping_id"])
+                with self._stats_lock:
+                    self.stats["exported"] += len(items)
+            if writer is not None:
+                finished, writer = writer, None
+                self._finish_chunk(finished, written_ids)
+        finally:
+            if writer is not None:
+                writer.close()
+        return files
+
+    def _finish_chunk(self, writer, shipping_ids):
+        # Mark items only once their chunk file is complete, so a failed run exports them again.
+        writer.close()
+        self.repository.mark_exported(shipping_ids, self.exported_at)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export completed and failed shipments to local files")
+    parser.add_argument("output_dir")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="jsonl")
+    parser.add_argument("--segments", type=int, default=RECONCILE_TOTAL_SEGMENTS)
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("--include-exported", action="store_true",
+                        help="Export again shipments already exported by an earlier run")
+    parser.add_argument("--enable-ttl", action="store_true",
+                        help="Enable DynamoDB TTL on the shipping table before exporting")
+    args = parser.parse_args(argv)
+    install_from_env()
+
+    repository = ShippingRepository()
+    if args.enable_ttl:
+        repository.enable_ttl()
+    exporter = ShippingExporter(repository, args.output_dir, args.format, args.segments, args.chunk_size,
+                                include_exported=args.include_exported)
+    files = exporter.run()
+    print(json.dumps({"exported": exporter.stats["exported"], "files": files}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
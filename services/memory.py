@@ -0,0 +1,88 @@
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from .repository import ShippingRepository
+
+
+class InMemoryShippingRepository:
+    TERMINAL_STATUSES = ShippingRepository.TERMINAL_STATUSES
+
+    def __init__(self):
+        self.items = {}
+        self._lock = threading.Lock()
+
+    def get_shipping(self, shipping_id):
+        with self._lock:
+            item = self.items.get(shipping_id)
+            return dict(item) if item else None
+
+    def get_shipping_status(self, shipping_id):
+        with self._lock:
+            item = self.items.get(shipping_id)
+            return item["shipping_status"] if item else None
+
+    def get_shipping_statuses(self, shipping_ids):
+        with self._lock:
+            return {
+                shipping_id: self.items[shipping_id]["shipping_status"]
+                for shipping_id in dict.fromkeys(shipping_ids) if shipping_id in self.items
+            }
+
+    def create_shipping(self, shipping_type: str, product_ids: list, order_id: str, status: str, due_date: datetime):
+        shipping_id = str(uuid4())
+        item = {
+            "shipping_id": shipping_id,
+            "shipping_type": shipping_type,
+            "order_id": order_id,
+            "product_ids": ",".join(product_ids),
+            "shipping_status": status,
+            "created_date": datetime.now(timezone.utc).isoformat(),
+            "due_date": due_date.replace(tzinfo=timezone.utc).isoformat()
+        }
+        with self._lock:
+            self.items[shipping_id] = item
+        return shipping_id
+
+    def update_shipping_status(self, shipping_id, status):
+        with self._lock:
+            self.items[shipping_id]["shipping_status"] = status
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def update_shipping_status_if(self, shipping_id, status, expected_status):
+        with self._lock:
+            if self.items[shipping_id]["shipping_status"] != expected_status:
+                return None
+            self.items[shipping_id]["shipping_status"] = status
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+
+class InMemoryShippingPublisher:
+    def __init__(self, wait_seconds: float = 0.1):
+        self.wait_seconds = wait_seconds
+        self.messages = deque()
+        self._condition = threading.Condition()
+
+    def send_new_shipping(self, shipping_id: str):
+        with self._condition:
+            self.messages.append(shipping_id)
+            self._condition.notify()
+        return str(uuid4())
+
+    def send_new_shippings(self, shipping_ids: list):
+        for shipping_id in shipping_ids:
+            self.send_new_shipping(shipping_id)
+        return []
+
+    def poll_shipping(self, batch_size: int = 10):
+        with self._condition:
+            if not self.messages:
+                self._condition.wait(self.wait_seconds)
+            return [self.messages.popleft() for _ in range(min(batch_size, len(self.messages)))]
+
+    def ack_shipping(self, shipping_ids: list, failed_ids: list = ()):
+        pass
+
+    def flush(self):
+        pass
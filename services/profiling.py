@@ -0,0 +1,156 @@
+import functools
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from .config import (
+    PROFILE_ENABLED, PROFILE_ON_START, PROFILE_SIGNAL, PROFILE_OUTPUT_DIR, PROFILE_WINDOW_SECONDS,
+    PROFILE_SAMPLE_INTERVAL_SECONDS, PROFILE_TOP_ALLOCATIONS,
+)
+
+# Thread id -> qualified name of the outermost profiled entry point it is running.
+_active_entries = {}
+_sampling = False
+
+
+def profiled(func):
+    label = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _sampling:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        if thread_id in _active_entries:
+            return func(*args, **kwargs)
+        _active_entries[thread_id] = label
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _active_entries.pop(thread_id, None)
+
+    return wrapper
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self, output_dir: str = PROFILE_OUTPUT_DIR, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS,
+                 top_allocations: int = PROFILE_TOP_ALLOCATIONS):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top_allocations = top_allocations
+        self.stacks = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._started_tracemalloc = False
+        self.last_reports = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = PROFILE_WINDOW_SECONDS):
+        global _sampling  # pylint: disable=global-statement
+        with self._lock:
+            if self.running:
+                return False
+            self.stacks = Counter()
+            self.samples = 0
+            self._stop_event.clear()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            _sampling = True
+            self._thread = threading.Thread(target=self._run, args=(duration,), name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        return self.last_reports
+
+    def _run(self, duration):
+        global _sampling  # pylint: disable=global-statement
+        sampler_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+        try:
+            while not self._stop_event.is_set() and time.monotonic() < deadline:
+                self._sample(sampler_id)
+                self._stop_event.wait(self.interval)
+        finally:
+            _sampling = False
+            _active_entries.clear()
+            self.last_reports = self._write_reports()
+
+    def _sample(self, sampler_id):
+        self.samples += 1
+        entries = dict(_active_entries)
+        for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            label = entries.get(thread_id)
+            if thread_id == sampler_id or label is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(label)
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def _write_reports(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        suffix = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        stacks_path = os.path.join(self.output_dir, f"profile-{suffix}.collapsed")
+        with open(stacks_path, "w", encoding="utf-8") as stacks_file:
+            for stack, count in self.stacks.most_common():
+                stacks_file.write(f"{stack} {count}\n")
+
+        allocations_path = os.path.join(self.output_dir, f"allocations-{suffix}.txt")
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        with open(allocations_path, "w", encoding="utf-8") as allocations_file:
+            for statistic in snapshot.statistics("lineno")[:self.top_allocations]:
+                allocations_file.write(f"{statistic}\n")
+        return stacks_path, allocations_path
+
+
+profiler = SamplingProfiler()
+
+
+_start_requested = threading.Event()
+_installed = False
+
+
+def _watch_start_requests():
+    while True:
+        _start_requested.wait()
+        _start_requested.clear()
+        profiler.start()
+
+
+def install_from_env():
+    global _installed  # pylint: disable=global-statement
+    if not PROFILE_ENABLED or _installed:
+        return
+    _installed = True
+    signal_number = getattr(signal, PROFILE_SIGNAL, None)
+    if signal_number is not None and threading.current_thread() is threading.main_thread():
+        # The handler may interrupt the main thread while it holds profiler._lock, so it only sets a flag
+        # and a watcher thread does the actual start.
+        threading.Thread(target=_watch_start_requests, name="profiler-trigger", daemon=True).start()
+        signal.signal(signal_number, lambda *_: _start_requested.set())
+    if PROFILE_ON_START:
+        profiler.start()
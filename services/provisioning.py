@@ -0,0 +1,75 @@
+import uuid
+from contextlib import contextmanager
+
+from .config import SHIPPING_QUEUE, CARRIER_QUEUES, SHIPPING_NAMESPACE, namespaced
+from .db import get_dynamodb_client, shipping_table_name, counters_table_name
+from .publisher import get_sqs_client, DEAD_LETTER_SUFFIX
+
+
+def queue_names(namespace: str = SHIPPING_NAMESPACE, carrier_queues: bool = False):
+    names = [SHIPPING_QUEUE] + (list(CARRIER_QUEUES.values()) if carrier_queues else [])
+    return [namespaced(name, namespace) for name in names]
+
+
+def table_keys(namespace: str = SHIPPING_NAMESPACE):
+    return {
+        shipping_table_name(namespace): "shipping_id",
+        counters_table_name(namespace): "counter_key",
+    }
+
+
+def provision(namespace: str = SHIPPING_NAMESPACE, carrier_queues: bool = False):
+    dynamo_client = get_dynamodb_client()
+    existing_tables = dynamo_client.list_tables()["TableNames"]
+    for table_name, key in table_keys(namespace).items():
+        if table_name in existing_tables:
+            continue
+        dynamo_client.create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        dynamo_client.get_waiter("table_exists").wait(TableName=table_name)
+
+    sqs_client = get_sqs_client()
+    return {
+        "table": shipping_table_name(namespace),
+        "counters_table": counters_table_name(namespace),
+        "queues": [
+            sqs_client.create_queue(QueueName=queue_name)["QueueUrl"]
+            for queue_name in queue_names(namespace, carrier_queues)
+        ],
+    }
+
+
+def teardown(namespace: str = SHIPPING_NAMESPACE, carrier_queues: bool = False):
+    dynamo_client = get_dynamodb_client()
+    existing_tables = dynamo_client.list_tables()["TableNames"]
+    for table_name in table_keys(namespace):
+        if table_name in existing_tables:
+            dynamo_client.delete_table(TableName=table_name)
+
+    sqs_client = get_sqs_client()
+    for queue_name in queue_names(namespace, carrier_queues):
+        teardown_queue(sqs_client, queue_name)
+        teardown_queue(sqs_client, queue_name + DEAD_LETTER_SUFFIX)
+
+
+def teardown_queue(sqs_client, queue_name: str):
+    try:
+        queue_url = sqs_client.get_queue_url(QueueName=queue_name)["QueueUrl"]
+    except sqs_client.exceptions.QueueDoesNotExist:
+        return
+    sqs_client.delete_queue(QueueUrl=queue_url)
+
+
+@contextmanager
+def isolated_namespace(prefix: str = "ns", carrier_queues: bool = False):
+    namespace = f"{prefix}-{uuid.uuid4().hex[:8]}"
+    try:
+        # Inside the try, so tables or queues created before a failing step are still removed.
+        provision(namespace, carrier_queues)
+        yield namespace
+    finally:
+        teardown(namespace, carrier_queues)
@@ -1,37 +1,275 @@
+import threading
+import time
+
 import boto3
 
-from .config import AWS_ENDPOINT_URL, AWS_REGION, SHIPPING_QUEUE
+from .config import (
+    AWS_ENDPOINT_URL, AWS_REGION, SHIPPING_QUEUE, CARRIER_QUEUES, SHIPPING_NAMESPACE, namespaced,
+    SHIPPING_PACKED_MESSAGES, SHIPPING_PACK_MAX_BYTES, SHIPPING_PACK_MAX_IDS,
+    SHIPPING_PACK_LINGER_SECONDS, SHIPPING_MAX_RECEIVE_COUNT,
+)
+from .profiling import profiled
+from .resilience import BOTO_CONFIG, get_resilient_caller
+
+
+def get_sqs_client():
+    return boto3.client(
+        "sqs",
+        endpoint_url=AWS_ENDPOINT_URL,
+        region_name=AWS_REGION,
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        config=BOTO_CONFIG,
+    )
+
+
+PACK_VERSION_ATTRIBUTE = "shipping_pack_version"
+PACK_VERSION = "1"
+PACK_SEPARATOR = "\n"
+# Deliveries a re-sent id already had, so a poison id keeps counting towards the dead-letter queue.
+ATTEMPTS_ATTRIBUTE = "shipping_attempts"
+DEAD_LETTER_SUFFIX = "-dlq"
+
+
+# Pack format v1: newline-joined ids in the body, tagged with a version attribute; untagged bodies hold one id.
+def pack_shipping_ids(shipping_ids: list, max_bytes: int = SHIPPING_PACK_MAX_BYTES,
+                      max_ids: int = SHIPPING_PACK_MAX_IDS):
+    packs = []
+    pack = []
+    size = 0
+    for shipping_id in shipping_ids:
+        id_size = len(shipping_id.encode()) + len(PACK_SEPARATOR)
+        if pack and (size + id_size > max_bytes or len(pack) >= max_ids):
+            packs.append(PACK_SEPARATOR.join(pack))
+            pack, size = [], 0
+        pack.append(shipping_id)
+        size += id_size
+    if pack:
+        packs.append(PACK_SEPARATOR.join(pack))
+    return packs
+
+
+def unpack_shipping_message(message: dict):
+    version = message.get("MessageAttributes", {}).get(PACK_VERSION_ATTRIBUTE, {}).get("StringValue")
+    if version is None:
+        return [message["Body"]]
+    if version == PACK_VERSION:
+        return message["Body"].split(PACK_SEPARATOR)
+    return None
 
 
 class ShippingPublisher:
-    def __init__(self):
-        self.client = boto3.client(
-            "sqs",
-            endpoint_url=AWS_ENDPOINT_URL,
-            region_name=AWS_REGION,
-            aws_access_key_id="test",
-            aws_secret_access_key="test",
-        )
-        response = self.client.create_queue(QueueName=SHIPPING_QUEUE)
+    SEND_BATCH_LIMIT: int = 10
+    # Unsettled messages become visible again after the queue visibility timeout, so older handles are stale.
+    IN_FLIGHT_TTL_SECONDS: float = 600
+
+    def __init__(self, queue_name: str = SHIPPING_QUEUE, client=None, resilience=None,
+                 namespace: str = SHIPPING_NAMESPACE, packed: bool = SHIPPING_PACKED_MESSAGES,
+                 linger_seconds: float = SHIPPING_PACK_LINGER_SECONDS):
+        self.packed = packed
+        self.linger_seconds = linger_seconds
+        self._pending = []
+        self._linger_timer = None
+        self._pending_lock = threading.Lock()
+        self._in_flight = {}
+        self._handles_by_id = {}
+        self._lock = threading.Lock()
+        self.client = client or get_sqs_client()
+        self.resilience = resilience or get_resilient_caller("sqs")
+        self.queue_name = namespaced(queue_name, namespace)
+        response = self.resilience.call(self.client.create_queue, QueueName=self.queue_name)
         self.queue_url = response["QueueUrl"]
+        self._dead_letter_url = None
+
+    @classmethod
+    def for_carriers(cls, carrier_queues: dict = None, namespace: str = SHIPPING_NAMESPACE):
+        client = get_sqs_client()
+        return {
+            shipping_type: cls(queue_name, client=client, namespace=namespace)
+            for shipping_type, queue_name in (carrier_queues or CARRIER_QUEUES).items()
+        }
 
+    @profiled
     def send_new_shipping(self, shipping_id: str):
-        response = self.client.send_message(
+        if self.packed:
+            # Buffered ids lost to a crash stay "in progress" and are re-enqueued by reconciliation.
+            self._buffer_shipping_ids([shipping_id])
+            return None
+
+        response = self.resilience.call(
+            self.client.send_message,
             QueueUrl=self.queue_url,
             MessageBody=shipping_id
         )
 
         return response['MessageId']
 
+    @profiled
+    def send_new_shippings(self, shipping_ids: list):
+        if self.packed:
+            for body in pack_shipping_ids(shipping_ids):
+                self.send_packed(body)
+            return []
+
+        failed_ids = []
+        for start in range(0, len(shipping_ids), self.SEND_BATCH_LIMIT):
+            chunk = shipping_ids[start:start + self.SEND_BATCH_LIMIT]
+            response = self.resilience.call(
+                self.client.send_message_batch,
+                QueueUrl=self.queue_url,
+                Entries=[{"Id": str(index), "MessageBody": shipping_id} for index, shipping_id in enumerate(chunk)]
+            )
+            failed_ids.extend(chunk[int(entry["Id"])] for entry in response.get("Failed", []))
+
+        return failed_ids
+
+    def flush(self):
+        with self._pending_lock:
+            shipping_ids = self._take_pending()
+        packs = pack_shipping_ids(shipping_ids)
+        for index, body in enumerate(packs):
+            try:
+                self.send_packed(body)
+            except Exception:
+                self._buffer_shipping_ids([i for pack in packs[index:] for i in pack.split(PACK_SEPARATOR)], front=True)
+                raise
+
+    def _buffer_shipping_ids(self, shipping_ids: list, front: bool = False):
+        with self._pending_lock:
+            if front:
+                self._pending[:0] = shipping_ids
+            else:
+                self._pending.extend(shipping_ids)
+            if front or len(self._pending) < SHIPPING_PACK_MAX_IDS:
+                if self._linger_timer is None:
+                    self._linger_timer = threading.Timer(self.linger_seconds, self._flush_on_timer)
+                    self._linger_timer.daemon = True
+                    self._linger_timer.start()
+                return
+        self.flush()
+
+    def _take_pending(self):
+        if self._linger_timer is not None:
+            self._linger_timer.cancel()
+            self._linger_timer = None
+        shipping_ids, self._pending = self._pending, []
+        return shipping_ids
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:  # pylint: disable=broad-except
+            pass  # flush() has put the ids back and scheduled another attempt
+
+    def send_packed(self, body: str, attempts: int = 0):
+        attributes = {PACK_VERSION_ATTRIBUTE: {"DataType": "String", "StringValue": PACK_VERSION}}
+        if attempts:
+            attributes[ATTEMPTS_ATTRIBUTE] = {"DataType": "Number", "StringValue": str(attempts)}
+        response = self.resilience.call(
+            self.client.send_message,
+            QueueUrl=self.queue_url,
+            MessageBody=body,
+            MessageAttributes=attributes
+        )
+
+        return response['MessageId']
+
+    @profiled
     def poll_shipping(self, batch_size: int = 10):
-        messages = self.client.receive_message(
+        messages = self.resilience.call(
+            self.client.receive_message,
             QueueUrl=self.queue_url,
             MessageAttributeNames=['All'],
+            AttributeNames=['ApproximateReceiveCount'],
             MaxNumberOfMessages=batch_size,
-            WaitTimeSeconds=10
+            WaitTimeSeconds=10,
+            deadline=max(self.resilience.deadline, 15)
         )
 
         if 'Messages' not in messages:
             return []
 
-        return [msg['Body'] for msg in messages['Messages']]
+        received = []
+        for message in messages['Messages']:
+            deliveries = self.deliveries(message)
+            if deliveries > SHIPPING_MAX_RECEIVE_COUNT:
+                self._dead_letter(message)
+            else:
+                received.append((message, deliveries))
+
+        shipping_ids = []
+        now = time.monotonic()
+        with self._lock:
+            self._forget_stale(now)
+            for message, deliveries in received:
+                message_ids = unpack_shipping_message(message)
+                if message_ids is None:  # unknown pack version: leave it until it is dead-lettered
+                    continue
+                handle = message['ReceiptHandle']
+                self._in_flight[handle] = (now, message_ids, set(message_ids), deliveries)
+                for shipping_id in message_ids:
+                    self._handles_by_id.setdefault(shipping_id, set()).add(handle)
+                shipping_ids.extend(message_ids)
+
+        return shipping_ids
+
+    @profiled
+    def ack_shipping(self, shipping_ids: list, failed_ids: list = ()):
+        # Messages without acked or failed ids are left for redelivery; a touched pack re-sends only its remaining ids,
+        # carrying the delivery count over so that an id that failed keeps moving towards the dead-letter queue.
+        touched = set()
+        with self._lock:
+            for shipping_id in shipping_ids:
+                for handle in self._handles_by_id.pop(shipping_id, ()):
+                    if handle in self._in_flight:
+                        self._in_flight[handle][2].discard(shipping_id)
+                        touched.add(handle)
+            # A pack whose first id failed has nothing acked, but the failed id must still be split out of it.
+            for shipping_id in failed_ids:
+                touched.update(handle for handle in self._handles_by_id.get(shipping_id, ()) if handle in self._in_flight)
+            settled = [(handle, self._in_flight[handle][3], self._release(handle)) for handle in touched]
+
+        failed_ids = set(failed_ids)
+        for handle, deliveries, pending_ids in settled:
+            failed = [shipping_id for shipping_id in pending_ids if shipping_id in failed_ids]
+            for body in pack_shipping_ids(failed):
+                self.send_packed(body, attempts=deliveries)
+            for body in pack_shipping_ids([shipping_id for shipping_id in pending_ids if shipping_id not in failed_ids]):
+                self.send_packed(body, attempts=deliveries - 1)
+            self.resilience.call(self.client.delete_message, QueueUrl=self.queue_url, ReceiptHandle=handle)
+
+    @staticmethod
+    def deliveries(message: dict):
+        carried = message.get("MessageAttributes", {}).get(ATTEMPTS_ATTRIBUTE, {}).get("StringValue", "0")
+        return int(carried) + int(message.get("Attributes", {}).get("ApproximateReceiveCount", "1"))
+
+    def _dead_letter(self, message: dict):
+        if self._dead_letter_url is None:
+            response = self.resilience.call(self.client.create_queue, QueueName=self.queue_name + DEAD_LETTER_SUFFIX)
+            self._dead_letter_url = response["QueueUrl"]
+        attributes = {
+            name: {"DataType": value.get("DataType", "String"), "StringValue": value["StringValue"]}
+            for name, value in message.get("MessageAttributes", {}).items()
+        }
+        self.resilience.call(
+            self.client.send_message,
+            QueueUrl=self._dead_letter_url,
+            MessageBody=message["Body"],
+            MessageAttributes=attributes
+        )
+        self.resilience.call(self.client.delete_message, QueueUrl=self.queue_url, ReceiptHandle=message["ReceiptHandle"])
+
+    def _release(self, handle):
+        _, message_ids, pending, _ = self._in_flight.pop(handle)
+        for shipping_id in pending:
+            handles = self._handles_by_id.get(shipping_id)
+            if handles is not None:
+                handles.discard(handle)
+                if not handles:
+                    del self._handles_by_id[shipping_id]
+        return [shipping_id for shipping_id in message_ids if shipping_id in pending]
+
+    def _forget_stale(self, now):
+        stale = [h for h, entry in self._in_flight.items() if now - entry[0] > self.IN_FLIGHT_TTL_SECONDS]
+        for handle in stale:
+            self._release(handle)
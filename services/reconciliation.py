@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from boto3.dynamodb.conditions import Attr
+
+from .config import RECONCILE_STUCK_AFTER_MINUTES, RECONCILE_TOTAL_SEGMENTS, RECONCILE_BATCH_SIZE
+from .publisher import ShippingPublisher
+from .repository import ShippingRepository
+from .service import ShippingService
+from .profiling import install_from_env
+
+STUCK_SCAN_PROJECTION = "shipping_id, shipping_type, shipping_status, created_date, due_date"
+
+
+class ReconciliationCheckpoint:
+    def __init__(self, path: str = None):
+        self.path = path
+        self._segments = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as checkpoint_file:
+                self._segments = {int(segment): state for segment, state in json.load(checkpoint_file).items()}
+
+    def get(self, segment: int):
+        with self._lock:
+            return dict(self._segments.get(segment, {}))
+
+    def save(self, segment: int, start_key, done: bool):
+        with self._lock:
+            self._segments[segment] = {"start_key": start_key, "done": done}
+            if not self.path:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as checkpoint_file:
+                json.dump(self._segments, checkpoint_file)
+            os.replace(tmp_path, self.path)
+
+
+class ShippingReconciler:
+    def __init__(self, shipping_service, stuck_after: timedelta = timedelta(minutes=RECONCILE_STUCK_AFTER_MINUTES),
+                 total_segments: int = RECONCILE_TOTAL_SEGMENTS, batch_size: int = RECONCILE_BATCH_SIZE,
+                 checkpoint: ReconciliationCheckpoint = None, dry_run: bool = False):
+        self.shipping_service = shipping_service
+        self.stuck_after = stuck_after
+        self.total_segments = total_segments
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint or ReconciliationCheckpoint()
+        self.dry_run = dry_run
+        self.stats = defaultdict(int)
+        self._stats_lock = threading.Lock()
+
+    def run(self, now: datetime = None):
+        now = now or datetime.now(timezone.utc)
+        with ThreadPoolExecutor(max_workers=self.total_segments) as executor:
+            futures = [
+                executor.submit(self.reconcile_segment, segment, now)
+                for segment in range(self.total_segments)
+            ]
+            for future in futures:
+                future.result()
+        return dict(self.stats)
+
+    def reconcile_segment(self, segment: int, now: datetime):
+        state = self.checkpoint.get(segment)
+        if state.get("done"):
+            return
+
+        service = self.shipping_service
+        cutoff = (now - self.stuck_after).isoformat()
+        stuck_filter = (
+            Attr("shipping_status").is_in([service.SHIPPING_CREATED, service.SHIPPING_IN_PROGRESS])
+            & Attr("created_date").lt(cutoff)
+        )
+        pending = []
+        pages = service.repository.scan_segment(
+            segment, self.total_segments, filter_expression=stuck_filter,
+            projection=STUCK_SCAN_PROJECTION, start_key=state.get("start_key"),
+        )
+        for items, last_key in pages:
+            self._count("scanned_pages")
+            pending.extend(items)
+            while len(pending) >= self.batch_size:
+                self._repair(pending[:self.batch_size], now)
+                del pending[:self.batch_size]
+            if not pending:
+                self.checkpoint.save(segment, last_key, last_key is None)
+
+        if pending:
+            self._repair(pending, now)
+        self.checkpoint.save(segment, None, True)
+
+    def _repair(self, items, now: datetime):
+        service = self.shipping_service
+        to_requeue = defaultdict(list)
+        for item in items:
+            self._count("stuck")
+            if datetime.fromisoformat(item["due_date"]) < now:
+                if self.dry_run:
+                    self._count("failed")
+                # A consumer may have finished the shipping since the scan, so only fail it if nothing changed.
+                elif service.update_status_if(item["shipping_id"], service.SHIPPING_FAILED,
+                                              item["shipping_status"]) is None:
+                    self._count("skipped")
+                else:
+                    self._count("failed")
+                    service.count(f"status:{service.SHIPPING_FAILED}")
+            else:
+                to_requeue[item.get("shipping_type")].append(item)
+
+        for shipping_type, requeue_items in to_requeue.items():
+            shipping_ids = [item["shipping_id"] for item in requeue_items]
+            self._count("requeued", len(shipping_ids))
+            if self.dry_run:
+                continue
+            failed_ids = set(service.publisher_for(shipping_type).send_new_shippings(shipping_ids))
+            self._count("requeue_errors", len(failed_ids))
+            for item in requeue_items:
+                if item["shipping_id"] not in failed_ids and item["shipping_status"] == service.SHIPPING_CREATED:
+                    service.update_status_if(item["shipping_id"], service.SHIPPING_IN_PROGRESS, service.SHIPPING_CREATED)
+
+    def _count(self, counter, amount: int = 1):
+        with self._stats_lock:
+            self.stats[counter] += amount
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-enqueue or fail shipments stuck in created/in progress")
+    parser.add_argument("--stuck-minutes", type=float, default=RECONCILE_STUCK_AFTER_MINUTES)
+    parser.add_argument("--segments", type=int, default=RECONCILE_TOTAL_SEGMENTS)
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    parser.add_argument("--checkpoint", help="Path of a checkpoint file used to resume an interrupted run")
+    parser.add_argument("--carrier-queues", action="store_true",
+                        help="Re-enqueue into per-carrier queues instead of the shared queue")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+    install_from_env()
+
+    carrier_publishers = ShippingPublisher.for_carriers() if args.carrier_queues else None
+    shipping_service = ShippingService(ShippingRepository(), ShippingPublisher(), carrier_publishers=carrier_publishers)
+    reconciler = ShippingReconciler(
+        shipping_service,
+        stuck_after=timedelta(minutes=args.stuck_minutes),
+        total_segments=args.segments,
+        batch_size=args.batch_size,
+        checkpoint=ReconciliationCheckpoint(args.checkpoint),
+        dry_run=args.dry_run,
+    )
+    print(json.dumps(reconciler.run(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
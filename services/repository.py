@@ -1,22 +1,90 @@
-from .config import SHIPPING_TABLE_NAME
-from .db import get_dynamodb_resource
+from .config import SHIPPING_TTL_ATTRIBUTE, SHIPPING_EXPORTED_ATTRIBUTE, SHIPPING_RETENTION_DAYS, SHIPPING_NAMESPACE
+from .db import get_dynamodb_resource, shipping_table_name
+from .profiling import profiled
+from .resilience import get_resilient_caller
 
+import time
+from botocore.exceptions import ClientError
 from uuid import uuid4
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 
 class ShippingRepository:
+    BATCH_GET_LIMIT: int = 100
+    BATCH_GET_MAX_RETRIES: int = 5
+    TERMINAL_STATUSES = ('completed', 'failed')
 
-
-    def __init__(self):
-        dynamo_resource = get_dynamodb_resource()
-        self.table = dynamo_resource.Table(SHIPPING_TABLE_NAME)
+    def __init__(self, resilience=None, namespace: str = SHIPPING_NAMESPACE):
+        self.resilience = resilience or get_resilient_caller("dynamodb")
+        self.namespace = namespace
+        self.dynamo_resource = get_dynamodb_resource()
+        self.table = self.dynamo_resource.Table(shipping_table_name(namespace))
 
 
+    @profiled
     def get_shipping(self, shipping_id):
-        response = self.table.get_item(Key={"shipping_id": shipping_id})
+        response = self.resilience.call(self.table.get_item, Key={"shipping_id": shipping_id})
         return response.get("Item")
 
+    @profiled
+    def get_shipping_status(self, shipping_id):
+        response = self.resilience.call(
+            self.table.get_item,
+            Key={"shipping_id": shipping_id},
+            ProjectionExpression="shipping_status"
+        )
+        item = response.get("Item")
+        return item["shipping_status"] if item else None
+
+    @profiled
+    def get_shipping_statuses(self, shipping_ids):
+        unique_ids = list(dict.fromkeys(shipping_ids))
+        statuses = {}
+        for start in range(0, len(unique_ids), self.BATCH_GET_LIMIT):
+            chunk = unique_ids[start:start + self.BATCH_GET_LIMIT]
+            for item in self._batch_get([{"shipping_id": shipping_id} for shipping_id in chunk]):
+                statuses[item["shipping_id"]] = item["shipping_status"]
+        return statuses
+
+    def _batch_get(self, keys):
+        table_name = self.table.name
+        request = {
+            table_name: {
+                "Keys": keys,
+                "ProjectionExpression": "shipping_id, shipping_status",
+            }
+        }
+        items = []
+        for attempt in range(self.BATCH_GET_MAX_RETRIES + 1):
+            response = self.resilience.call(self.dynamo_resource.batch_get_item, RequestItems=request)
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                return items
+            time.sleep(min(0.05 * 2 ** attempt, 1.0))
+        raise RuntimeError(f"Could not read {len(request[table_name]['Keys'])} shippings after retries")
+
+    @profiled
+    def scan_segment(self, segment: int, total_segments: int, filter_expression=None,
+                     projection: str = None, start_key: dict = None, page_size: int = None):
+        kwargs = {"Segment": segment, "TotalSegments": total_segments}
+        if filter_expression is not None:
+            kwargs["FilterExpression"] = filter_expression
+        if projection:
+            kwargs["ProjectionExpression"] = projection
+        if page_size:
+            kwargs["Limit"] = page_size
+
+        while True:
+            if start_key:
+                kwargs["ExclusiveStartKey"] = start_key
+            response = self.resilience.call(self.table.scan, **kwargs)
+            start_key = response.get("LastEvaluatedKey")
+            yield response.get("Items", []), start_key
+            if not start_key:
+                return
+
+    @profiled
     def create_shipping(self, shipping_type: str, product_ids: list, order_id: str, status: str, due_date: datetime):
         shipping_id = str(uuid4())
         item = {
@@ -28,18 +96,82 @@ class ShippingRepository:
             "created_date": datetime.now(timezone.utc).isoformat(),
             "due_date": due_date.replace(tzinfo=timezone.utc).isoformat()
         }
-        self.table.put_item(Item=item)
+        self.resilience.call(self.table.put_item, Item=item)
         return shipping_id
 
+    @profiled
     def update_shipping_status(self, shipping_id, status):
-        response = self.table.update_item(
+        update_expression, values = self._status_update(status)
+
+        response = self.resilience.call(
+            self.table.update_item,
             Key={
                 'shipping_id': shipping_id,
             },
-            UpdateExpression='SET shipping_status = :sh_status',
-            ExpressionAttributeValues={
-                ':sh_status': status
-            }
+            UpdateExpression=update_expression,
+            ExpressionAttributeNames={'#ttl': SHIPPING_TTL_ATTRIBUTE},
+            ExpressionAttributeValues=values
         )
 
         return response
+
+    @profiled
+    def update_shipping_status_if(self, shipping_id, status, expected_status):
+        update_expression, values = self._status_update(status)
+        values[':expected'] = expected_status
+        try:
+            return self.resilience.call(
+                self.table.update_item,
+                Key={'shipping_id': shipping_id},
+                UpdateExpression=update_expression,
+                ConditionExpression='shipping_status = :expected',
+                ExpressionAttributeNames={'#ttl': SHIPPING_TTL_ATTRIBUTE},
+                ExpressionAttributeValues=values
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            raise
+
+    @profiled
+    def mark_exported(self, shipping_ids, exported_at: str):
+        for shipping_id in shipping_ids:
+            try:
+                self.resilience.call(
+                    self.table.update_item,
+                    Key={'shipping_id': shipping_id},
+                    UpdateExpression='SET #exported = :exported_at',
+                    ConditionExpression='attribute_exists(shipping_id)',
+                    ExpressionAttributeNames={'#exported': SHIPPING_EXPORTED_ATTRIBUTE},
+                    ExpressionAttributeValues={':exported_at': exported_at}
+                )
+            except ClientError as error:
+                # The item expired after it was exported; there is nothing left to mark.
+                if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+
+    def _status_update(self, status):
+        update_expression = 'SET shipping_status = :sh_status'
+        values = {':sh_status': status}
+        if status in self.TERMINAL_STATUSES:
+            update_expression += ', #ttl = :expires_at'
+            values[':expires_at'] = self.expiration_timestamp()
+        else:
+            update_expression += ' REMOVE #ttl'
+        return update_expression, values
+
+    @staticmethod
+    def expiration_timestamp(now: datetime = None):
+        now = now or datetime.now(timezone.utc)
+        return int((now + timedelta(days=SHIPPING_RETENTION_DAYS)).timestamp())
+
+    def enable_ttl(self):
+        client = self.dynamo_resource.meta.client
+        description = self.resilience.call(client.describe_time_to_live, TableName=self.table.name)
+        if description["TimeToLiveDescription"].get("TimeToLiveStatus") in ("ENABLED", "ENABLING"):
+            return
+        self.resilience.call(
+            client.update_time_to_live,
+            TableName=self.table.name,
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": SHIPPING_TTL_ATTRIBUTE}
+        )
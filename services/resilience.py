@@ -0,0 +1,249 @@
+import random
+import threading
+import time
+
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError
+
+from .config import (
+    AWS_RATE_LIMIT_PER_SECOND, AWS_RATE_LIMIT_BURST, AWS_RATE_LIMIT_MIN_PER_SECOND,
+    AWS_RETRY_MAX_ATTEMPTS, AWS_RETRY_BASE_DELAY_SECONDS, AWS_RETRY_MAX_DELAY_SECONDS,
+    AWS_OPERATION_DEADLINE_SECONDS, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT_SECONDS,
+)
+
+# Retries are handled by ResilientCaller, so botocore must not retry on its own.
+BOTO_CONFIG = Config(retries={"mode": "standard", "total_max_attempts": 1})
+
+THROTTLING_ERROR_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "Throttling",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "RequestThrottled",
+    "RequestThrottledException",
+}
+TRANSIENT_ERROR_CODES = {
+    "InternalServerError",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "TransactionInProgressException",
+}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
+
+
+class AdaptiveTokenBucket:
+    def __init__(self, rate: float = AWS_RATE_LIMIT_PER_SECOND, capacity: float = AWS_RATE_LIMIT_BURST,
+                 min_rate: float = AWS_RATE_LIMIT_MIN_PER_SECOND, clock=time.monotonic):
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        # A call that gives up before running must not leave debt for the calls after it.
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    CLOSED: str = "closed"
+    OPEN: str = "open"
+    HALF_OPEN: str = "half-open"
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT_SECONDS, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        # Side-effect free: unlike allow_request() it never claims the half-open probe.
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            if self._state == self.OPEN and self.clock() - self._opened_at < self.reset_timeout:
+                return True
+            return self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self.clock() - self._opened_at < self.reset_timeout:
+                return False
+            if self._probe_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class ResilientCaller:
+    def __init__(self, name: str, rate_limiter: AdaptiveTokenBucket = None, circuit_breaker: CircuitBreaker = None,
+                 max_attempts: int = AWS_RETRY_MAX_ATTEMPTS, base_delay: float = AWS_RETRY_BASE_DELAY_SECONDS,
+                 max_delay: float = AWS_RETRY_MAX_DELAY_SECONDS, deadline: float = AWS_OPERATION_DEADLINE_SECONDS,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.name = name
+        self.rate_limiter = rate_limiter or AdaptiveTokenBucket(clock=clock)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(clock=clock)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.clock = clock
+        self.sleep = sleep
+        self.calls = 0
+        self.retries = 0
+        self.throttles = 0
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def call(self, operation, *args, deadline: float = None, **kwargs):
+        deadline_at = self.clock() + (self.deadline if deadline is None else deadline)
+        attempt = 0
+        while True:
+            if self.circuit_breaker.is_open():
+                self._count("rejected")
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            try:
+                self._pause(self.rate_limiter.reserve(), deadline_at)
+            except DeadlineExceededError:
+                self.rate_limiter.refund()
+                raise
+            # Admit only after the wait: a half-open probe must always reach record_success/record_failure.
+            if not self.circuit_breaker.allow_request():
+                self.rate_limiter.refund()
+                self._count("rejected")
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._count("calls")
+            try:
+                result = operation(*args, **kwargs)
+            except Exception as error:  # pylint: disable=broad-except
+                throttled = self.is_throttling(error)
+                if throttled:
+                    self._count("throttles")
+                    self.rate_limiter.on_throttle()
+                if not throttled and not self.is_transient(error):
+                    self.circuit_breaker.record_success()
+                    raise
+                self.circuit_breaker.record_failure()
+                attempt += 1
+                if attempt >= self.max_attempts:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                self._pause(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)), deadline_at)
+                continue
+
+            self.circuit_breaker.record_success()
+            self.rate_limiter.on_success()
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "circuit_state": self.circuit_breaker.state,
+                "rate_limit_per_second": self.rate_limiter.rate,
+                "calls": self.calls,
+                "retries": self.retries,
+                "throttles": self.throttles,
+                "failures": self.failures,
+                "rejected": self.rejected,
+            }
+
+    @staticmethod
+    def is_throttling(error) -> bool:
+        return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+    @staticmethod
+    def is_transient(error) -> bool:
+        if isinstance(error, BotoConnectionError):
+            return True
+        if not isinstance(error, ClientError):
+            return False
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return error.response.get("Error", {}).get("Code") in TRANSIENT_ERROR_CODES or status >= 500
+
+    def _pause(self, delay, deadline_at):
+        if delay <= 0:
+            return
+        if self.clock() + delay > deadline_at:
+            raise DeadlineExceededError(f"{self.name} call would exceed its deadline")
+        self.sleep(delay)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+_callers = {}
+_callers_lock = threading.Lock()
+
+
+def get_resilient_caller(name: str, **options) -> ResilientCaller:
+    with _callers_lock:
+        if name not in _callers:
+            _callers[name] = ResilientCaller(name, **options)
+        return _callers[name]
+
+
+def resilience_stats():
+    with _callers_lock:
+        return {name: caller.stats() for name, caller in _callers.items()}
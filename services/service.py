@@ -1,5 +1,12 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from .config import PIPELINE_WORKERS
 from .repository import ShippingRepository
 from .publisher import ShippingPublisher
+from .profiling import profiled
+from .waiter import StatusWaiter
 from datetime import datetime, timezone
 
 
@@ -9,37 +16,133 @@ class ShippingService:
     SHIPPING_COMPLETED: str = 'completed'
     SHIPPING_FAILED: str = 'failed'
 
-    def __init__(self, repository, publisher):
+    def __init__(self, repository, publisher, status_cache=None, carrier_publishers=None,
+                 admission_controller=None, counters=None):
         self.repository = repository
+        self.counters = counters
         self.publisher = publisher
+        self.carrier_publishers = carrier_publishers or {}
+        self.status_cache = status_cache
+        self.admission_controller = admission_controller
+        self._status_waiter = None
+        self._pipeline_executor = None
+        self._publish_executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def status_waiter(self):
+        if self._status_waiter is None:
+            self._status_waiter = StatusWaiter(self)
+        return self._status_waiter
 
     @staticmethod
     def list_available_shipping_type():
         return ['Нова Пошта', 'Укр Пошта', 'Meest Express', 'Самовивіз']
 
+    def publisher_for(self, shipping_type=None):
+        return self.carrier_publishers.get(shipping_type, self.publisher)
+
+    def admit(self):
+        if self.admission_controller is None:
+            return nullcontext()
+        return self.admission_controller.admit()
+
+    @profiled
     def create_shipping(self, shipping_type, product_ids, order_id, due_date):
+        with self.admit():
+            return self._create_shipping(shipping_type, product_ids, order_id, due_date)
+
+    def validate_shipping(self, shipping_type, due_date):
         if shipping_type not in self.list_available_shipping_type():
             raise ValueError("Shipping type is not available")
 
         if due_date <= datetime.now(timezone.utc):
             raise ValueError("Shipping due datetime must be greater than datetime now")
 
+    def _create_shipping(self, shipping_type, product_ids, order_id, due_date):
+        self.validate_shipping(shipping_type, due_date)
+
         shipping_id = self.repository.create_shipping(shipping_type, product_ids, order_id, self.SHIPPING_CREATED, due_date)
 
-        self.publisher.send_new_shipping(shipping_id)
-        self.repository.update_shipping_status(shipping_id, self.SHIPPING_IN_PROGRESS)
+        self.count_created(shipping_type)
+        self.publisher_for(shipping_type).send_new_shipping(shipping_id)
+        self.update_status(shipping_id, self.SHIPPING_IN_PROGRESS)
 
         return shipping_id
 
-    def process_shipping_batch(self):
+    def reserve_admission(self):
+        if self.admission_controller is None:
+            return None
+        return self.admission_controller.acquire()
+
+    @profiled
+    def create_shipping_async(self, shipping_type, product_ids, order_id, due_date, admission_slot=None):
+        self.validate_shipping(shipping_type, due_date)
+        with self._executor_lock:
+            if self._pipeline_executor is None:
+                self._pipeline_executor = ThreadPoolExecutor(PIPELINE_WORKERS, thread_name_prefix="shipping-pipeline")
+                self._publish_executor = ThreadPoolExecutor(PIPELINE_WORKERS, thread_name_prefix="shipping-publish")
+            return self._pipeline_executor.submit(
+                self._create_shipping_pipelined, shipping_type, product_ids, order_id, due_date,
+                admission_slot, self._publish_executor
+            )
+
+    def _create_shipping_pipelined(self, shipping_type, product_ids, order_id, due_date, admission_slot,
+                                   publish_executor):
+        with admission_slot or self.admit():
+            shipping_id = self.repository.create_shipping(
+                shipping_type, product_ids, order_id, self.SHIPPING_CREATED, due_date
+            )
+            self.count_created(shipping_type)
+            sent = publish_executor.submit(self.publisher_for(shipping_type).send_new_shipping, shipping_id)
+            # The consumer may finish the shipping before this update lands, so only move it out of "created".
+            self.repository.update_shipping_status_if(shipping_id, self.SHIPPING_IN_PROGRESS, self.SHIPPING_CREATED)
+            if self.status_cache is not None:
+                self.status_cache.invalidate(shipping_id)
+            sent.result()
+            return shipping_id
+
+    def flush(self):
+        for publisher in [self.publisher, *self.carrier_publishers.values()]:
+            publisher.flush()
+
+    def shutdown(self, wait=True):
+        with self._executor_lock:
+            pipeline_executor, publish_executor = self._pipeline_executor, self._publish_executor
+            self._pipeline_executor = self._publish_executor = None
+        # Pipelined tasks still submit to the publish pool, and both may leave ids in the publishers' pack buffers.
+        if wait:
+            self._close(pipeline_executor, publish_executor)
+        else:
+            threading.Thread(target=self._close, args=(pipeline_executor, publish_executor), daemon=True).start()
+
+    def _close(self, pipeline_executor, publish_executor):
+        if pipeline_executor is not None:
+            pipeline_executor.shutdown(wait=True)
+            publish_executor.shutdown(wait=True)
+        self.flush()
+        if self.counters is not None:
+            self.counters.close()
+
+    @profiled
+    def process_shipping_batch(self, shipping_type=None):
         result = []
-        shipping = self.publisher.poll_shipping()
-        for shipping_id in shipping:
-            shipping = self.process_shipping(shipping_id)
-            result.append(shipping)
+        publisher = self.publisher_for(shipping_type)
+        shipping_ids = publisher.poll_shipping()
+        processed_ids = []
+        try:
+            for shipping_id in shipping_ids:
+                result.append(self.process_shipping(shipping_id))
+                processed_ids.append(shipping_id)
+        finally:
+            # The id right after the processed ones is the one that raised, if any.
+            failed_ids = shipping_ids[len(processed_ids):len(processed_ids) + 1]
+            if processed_ids or failed_ids:
+                publisher.ack_shipping(processed_ids, failed_ids)
 
         return result
 
+    @profiled
     def process_shipping(self, shipping_id):
         shipping = self.repository.get_shipping(shipping_id)
         if datetime.fromisoformat(shipping['due_date']) < datetime.now(timezone.utc):
@@ -47,15 +150,78 @@ class ShippingService:
 
         return self.complete_shipping(shipping_id)
 
+    @profiled
     def check_status(self, shipping_id):
+        if self.status_cache is not None:
+            return self.status_cache.get_or_load(shipping_id, self.repository.get_shipping_status)
+
         shipping = self.repository.get_shipping(shipping_id)
 
         return shipping['shipping_status']
 
+    @profiled
+    def check_statuses(self, shipping_ids):
+        unique_ids = list(dict.fromkeys(shipping_ids))
+        statuses = {}
+        missing_ids = []
+        for shipping_id in unique_ids:
+            status = self.status_cache.get(shipping_id) if self.status_cache is not None else None
+            if status is None:
+                missing_ids.append(shipping_id)
+            else:
+                statuses[shipping_id] = status
+
+        if missing_ids:
+            if self.status_cache is not None:
+                loaded = self.status_cache.load_many(missing_ids, self.repository.get_shipping_statuses)
+            else:
+                loaded = self.repository.get_shipping_statuses(missing_ids)
+            for shipping_id in missing_ids:
+                statuses[shipping_id] = loaded.get(shipping_id)
+
+        return statuses
+
+    def wait_for_status(self, shipping_id, target_statuses, timeout=None):
+        return self.status_waiter.wait(shipping_id, target_statuses, timeout)
+
+    def update_status(self, shipping_id, status):
+        response = self.repository.update_shipping_status(shipping_id, status)
+        if self.status_cache is not None:
+            self.status_cache.invalidate(shipping_id)
+        return response
+
+    def update_status_if(self, shipping_id, status, expected_status):
+        response = self.repository.update_shipping_status_if(shipping_id, status, expected_status)
+        if response is not None and self.status_cache is not None:
+            self.status_cache.invalidate(shipping_id)
+        return response
+
     def fail_shipping(self, shipping_id):
-        response = self.repository.update_shipping_status(shipping_id, self.SHIPPING_FAILED)
+        response = self.update_status(shipping_id, self.SHIPPING_FAILED)
+        self.count(f"status:{self.SHIPPING_FAILED}")
         return response['ResponseMetadata']
 
     def complete_shipping(self, shipping_id):
-        response = self.repository.update_shipping_status(shipping_id, self.SHIPPING_COMPLETED)
+        response = self.update_status(shipping_id, self.SHIPPING_COMPLETED)
+        self.count(f"status:{self.SHIPPING_COMPLETED}")
         return response['ResponseMetadata']
+
+    def count(self, *keys):
+        if self.counters is not None:
+            self.counters.record(*keys)
+
+    def count_created(self, shipping_type):
+        self.count(f"status:{self.SHIPPING_CREATED}", f"carrier:{shipping_type}")
+
+    @profiled
+    def shipping_stats(self):
+        if self.counters is None:
+            return None
+        statuses = [self.SHIPPING_CREATED, self.SHIPPING_COMPLETED, self.SHIPPING_FAILED]
+        carriers = self.list_available_shipping_type()
+        totals = self.counters.read([f"status:{status}" for status in statuses] +
+                                    [f"carrier:{carrier}" for carrier in carriers])
+        return {
+            "statuses": {status: totals[f"status:{status}"] for status in statuses},
+            "carriers": {carrier: totals[f"carrier:{carrier}"] for carrier in carriers},
+        }
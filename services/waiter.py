@@ -0,0 +1,91 @@
+import random
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+from .config import WAIT_INITIAL_DELAY_SECONDS, WAIT_MAX_DELAY_SECONDS
+
+
+class StatusWaiter:
+    def __init__(self, shipping_service, initial_delay: float = WAIT_INITIAL_DELAY_SECONDS,
+                 max_delay: float = WAIT_MAX_DELAY_SECONDS):
+        self.shipping_service = shipping_service
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.polls = 0
+        self._pending = {}
+        self._delay = initial_delay
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def submit(self, shipping_id, target_statuses) -> Future:
+        future = Future()
+        with self._condition:
+            was_idle = not self._pending
+            self._pending.setdefault(shipping_id, []).append((frozenset(target_statuses), future))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="shipping-status-waiter", daemon=True)
+                self._thread.start()
+            if was_idle:
+                self._delay = self.initial_delay
+                self._condition.notify()
+        return future
+
+    def wait(self, shipping_id, target_statuses, timeout=None):
+        future = self.submit(shipping_id, target_statuses)
+        try:
+            return future.result(timeout)
+        finally:
+            future.cancel()
+
+    def pending_count(self):
+        with self._condition:
+            self._drop_done()
+            return sum(len(waiters) for waiters in self._pending.values())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._drop_done()
+                while not self._pending:
+                    self._condition.wait()
+                    self._drop_done()
+                shipping_ids = list(self._pending)
+
+            try:
+                statuses = self.shipping_service.check_statuses(shipping_ids)
+            except Exception:  # pylint: disable=broad-except
+                statuses = {}
+            self.polls += 1
+
+            with self._condition:
+                resolved = self._resolve(statuses)
+                self._drop_done()
+                if resolved:
+                    self._delay = self.initial_delay
+                else:
+                    self._delay = min(self._delay * 2, self.max_delay)
+                if self._pending:
+                    self._condition.wait(self._delay / 2 + random.uniform(0, self._delay / 2))
+
+    def _resolve(self, statuses):
+        resolved = 0
+        for shipping_id, waiters in self._pending.items():
+            status = statuses.get(shipping_id)
+            if status is None:
+                continue
+            for targets, future in waiters:
+                if status in targets and not future.done():
+                    try:
+                        future.set_result(status)
+                        resolved += 1
+                    except InvalidStateError:
+                        pass
+        return resolved
+
+    def _drop_done(self):
+        for shipping_id in list(self._pending):
+            waiters = [waiter for waiter in self._pending[shipping_id] if not waiter[1].done()]
+            if waiters:
+                self._pending[shipping_id] = waiters
+            else:
+                del self._pending[shipping_id]
@@ -1,44 +1,17 @@
 import pytest
-import boto3
 from services.config import *
 from services.db import get_dynamodb_resource
+from services.provisioning import provision, teardown
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_localstack_resources():
-    dynamo_client = boto3.client(
-        "dynamodb",
-        endpoint_url=AWS_ENDPOINT_URL,
-        region_name=AWS_REGION,
-        aws_access_key_id="test",
-        aws_secret_access_key="test"
-    )
-
-    existing_tables = dynamo_client.list_tables()["TableNames"]
-    if SHIPPING_TABLE_NAME not in existing_tables:
-        dynamo_client.create_table(
-            TableName=SHIPPING_TABLE_NAME,
-            KeySchema=[{"AttributeName": "shipping_id", "KeyType": "HASH"}],
-            AttributeDefinitions=[{"AttributeName": "shipping_id", "AttributeType": "S"}],
-            BillingMode="PAY_PER_REQUEST",
-        )
-        dynamo_client.get_waiter("table_exists").wait(TableName=SHIPPING_TABLE_NAME)
-
-    sqs_client = boto3.client(
-        "sqs",
-        endpoint_url=AWS_ENDPOINT_URL,
-        region_name=AWS_REGION,
-        aws_access_key_id="test",
-        aws_secret_access_key="test"
-    )
-    response = sqs_client.create_queue(QueueName=SHIPPING_QUEUE)
-    queue_url = response["QueueUrl"]
+    provision(SHIPPING_NAMESPACE)
 
     yield
 
-    dynamo_client.delete_table(TableName=SHIPPING_TABLE_NAME)
-    sqs_client.delete_queue(QueueUrl=queue_url)
+    teardown(SHIPPING_NAMESPACE)
 
 
 @pytest.fixture
 def dynamo_resource():
-    return get_dynamodb_resource()
\ No newline at end of file
+    return get_dynamodb_resource()
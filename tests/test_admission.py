@@ -0,0 +1,120 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app.eshop import Product, ShoppingCart, Order
+from services import ShippingService, AdmissionController, OverloadedError
+
+
+# Тест 1: Перевантажений сервіс відхиляє замовлення до списання товару
+def test_place_order_rejected_when_saturated(mocker):
+    controller = AdmissionController(initial_limit=1, max_queue=0)
+    shipping_service = ShippingService(mocker.Mock(), mocker.Mock(), admission_controller=controller)
+    product = Product(name="Laptop", price=1200, available_amount=5)
+    cart = ShoppingCart()
+    cart.add_product(product, amount=1)
+
+    with controller.admit():
+        errors = []
+
+        def place():
+            try:
+                Order(cart, shipping_service).place_order(
+                    ShippingService.list_available_shipping_type()[0],
+                    due_date=datetime.now(timezone.utc) + timedelta(days=1)
+                )
+            except OverloadedError as error:
+                errors.append(error)
+
+        worker = threading.Thread(target=place)
+        worker.start()
+        worker.join()
+
+    assert len(errors) == 1 and errors[0].retryable
+    assert product.available_amount == 5
+    assert controller.stats()["rejected"] == 1
+
+
+# Тест 2: Вкладений виклик create_shipping не займає другий слот
+def test_place_order_admits_once(mocker):
+    controller = AdmissionController(initial_limit=1, max_queue=0)
+    mock_repo = mocker.Mock()
+    mock_repo.create_shipping.return_value = "shipping_1"
+    shipping_service = ShippingService(mock_repo, mocker.Mock(), admission_controller=controller)
+    cart = ShoppingCart()
+    cart.add_product(Product(name="Mouse", price=20, available_amount=5), amount=1)
+
+    shipping_id = Order(cart, shipping_service).place_order(
+        ShippingService.list_available_shipping_type()[0],
+        due_date=datetime.now(timezone.utc) + timedelta(days=1)
+    )
+
+    assert shipping_id == "shipping_1"
+    assert controller.stats()["admitted"] == 1
+    assert controller.stats()["in_flight"] == 0
+
+
+# Тест 3: Ліміт зменшується при повільних запитах і зростає при швидких
+def test_limit_adapts_to_latency(mocker):
+    controller = AdmissionController(initial_limit=10, target_latency=0.5)
+    mocker.patch("services.admission.time.monotonic", side_effect=[0.0, 2.0])
+    with controller.admit():
+        pass
+    assert controller.stats()["limit"] == 9
+
+    mocker.patch("services.admission.time.monotonic", side_effect=[0.0, 0.01] * 10)
+    for _ in range(10):
+        with controller.admit():
+            pass
+    assert controller.stats()["limit"] == 10
+
+
+# Тест 4: Одночасне завершення багатьох повільних запитів зменшує ліміт лише раз
+def test_slow_burst_decreases_limit_once():
+    controller = AdmissionController(initial_limit=20, target_latency=0.5)
+    for _ in range(20):
+        controller._acquire()
+    for _ in range(20):
+        controller._release(0.0, 1.0)
+    assert controller.stats()["limit"] == 18
+
+    controller._acquire()
+    controller._release(1.5, 2.5)
+    assert controller.stats()["limit"] == 16
+
+
+# Тест 5: Швидкі помилки не збільшують ліміт
+def test_failed_calls_do_not_raise_limit(mocker):
+    controller = AdmissionController(initial_limit=10, target_latency=0.5)
+    mocker.patch("services.admission.time.monotonic", side_effect=[0.0, 0.01] * 5)
+    for _ in range(5):
+        try:
+            with controller.admit():
+                raise ValueError("Shipping type is not available")
+        except ValueError:
+            pass
+
+    assert controller.limit == 10
+    assert controller.stats()["in_flight"] == 0
+
+
+# Тест 6: Запит чекає в черзі та отримує слот після звільнення
+def test_waiting_request_is_admitted_after_release():
+    controller = AdmissionController(initial_limit=1, max_queue=1, queue_timeout=5)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with controller.admit():
+            entered.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait(5)
+    threading.Timer(0.05, release.set).start()
+
+    with controller.admit():
+        assert controller.stats()["in_flight"] == 1
+
+    holder.join()
+    assert controller.stats()["rejected"] == 0
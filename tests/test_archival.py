@@ -0,0 +1,83 @@
+import gzip
+import json
+from decimal import Decimal
+
+from services.export import ShippingExporter
+from services.repository import ShippingRepository
+
+
+def make_repository(mocker):
+    mock_resource = mocker.Mock()
+    mocker.patch("services.repository.get_dynamodb_resource", return_value=mock_resource)
+    return ShippingRepository(), mock_resource.Table.return_value
+
+
+# Тест 1: Термінальний статус встановлює атрибут TTL, проміжний - прибирає його
+def test_terminal_status_sets_ttl(mocker):
+    repo, table = make_repository(mocker)
+
+    repo.update_shipping_status("a", "completed")
+    kwargs = table.update_item.call_args.kwargs
+    assert kwargs["UpdateExpression"] == "SET shipping_status = :sh_status, #ttl = :expires_at"
+    assert kwargs["ExpressionAttributeNames"] == {"#ttl": "expires_at"}
+    assert kwargs["ExpressionAttributeValues"][":expires_at"] > 0
+
+    repo.update_shipping_status("a", "in progress")
+    kwargs = table.update_item.call_args.kwargs
+    assert kwargs["UpdateExpression"] == "SET shipping_status = :sh_status REMOVE #ttl"
+    assert ":expires_at" not in kwargs["ExpressionAttributeValues"]
+
+
+# Тест 2: Умовний перехід у термінальний статус теж встановлює TTL
+def test_conditional_terminal_status_sets_ttl(mocker):
+    repo, table = make_repository(mocker)
+
+    repo.update_shipping_status_if("a", "failed", "in progress")
+
+    kwargs = table.update_item.call_args.kwargs
+    assert kwargs["UpdateExpression"] == "SET shipping_status = :sh_status, #ttl = :expires_at"
+    assert kwargs["ConditionExpression"] == "shipping_status = :expected"
+    assert kwargs["ExpressionAttributeNames"] == {"#ttl": "expires_at"}
+    assert kwargs["ExpressionAttributeValues"][":expires_at"] > 0
+    assert kwargs["ExpressionAttributeValues"][":expected"] == "in progress"
+
+
+# Тест 3: Експорт розбиває сегмент на стиснені файли JSON Lines
+def test_exporter_writes_chunked_gzip_files(mocker, tmp_path):
+    mock_repo = mocker.Mock()
+    mock_repo.TERMINAL_STATUSES = ShippingRepository.TERMINAL_STATUSES
+    items = [{"shipping_id": str(i), "shipping_status": "completed", "expires_at": Decimal(100 + i)} for i in range(5)]
+    mock_repo.scan_segment.side_effect = lambda segment, total, **kwargs: iter(
+        [(items[:3], {"shipping_id": "2"}), (items[3:], None)] if segment == 0 else [([], None)]
+    )
+
+    exporter = ShippingExporter(mock_repo, str(tmp_path), total_segments=2, chunk_size=2)
+    files = exporter.run()
+
+    assert len(files) == 3
+    exported = []
+    for path in files:
+        with gzip.open(path, "rt", encoding="utf-8") as export_file:
+            exported.extend(json.loads(line) for line in export_file)
+    assert [item["shipping_id"] for item in exported] == ["0", "1", "2", "3", "4"]
+    assert exported[0]["expires_at"] == 100
+    assert exporter.stats["exported"] == 5
+    marked = [i for call in mock_repo.mark_exported.call_args_list for i in call.args[0]]
+    assert marked == ["0", "1", "2", "3", "4"]
+    not_exported = mock_repo.scan_segment.call_args.kwargs["filter_expression"].get_expression()["values"][1]
+    assert not_exported.get_expression()["values"][0].name == "exported_at"
+
+
+# Тест 4: Повторний експорт у той самий каталог не перезаписує попередні файли
+def test_repeated_export_keeps_previous_files(mocker, tmp_path):
+    mock_repo = mocker.Mock()
+    mock_repo.TERMINAL_STATUSES = ShippingRepository.TERMINAL_STATUSES
+    mock_repo.scan_segment.side_effect = lambda segment, total, **kwargs: iter(
+        [([{"shipping_id": "a", "shipping_status": "failed"}], None)]
+    )
+
+    first = ShippingExporter(mock_repo, str(tmp_path), total_segments=1).run()
+    second = ShippingExporter(mock_repo, str(tmp_path), total_segments=1).run()
+
+    assert set(first).isdisjoint(second)
+    assert len(list(tmp_path.iterdir())) == 2
@@ -0,0 +1,51 @@
+import random
+from decimal import Decimal
+
+from app.eshop import Product, ShoppingCart
+from app.pricing import calculate_totals
+
+
+def random_carts(count, catalog):
+    carts = []
+    for _ in range(count):
+        cart = ShoppingCart()
+        for product in random.sample(catalog, random.randint(0, 8)):
+            cart.add_product(product, random.randint(1, 5))
+        carts.append(cart)
+    return carts
+
+
+# Тест 1: Пакетні суми точно збігаються з calculate_total
+def test_batch_totals_match_calculate_total():
+    random.seed(42)
+    catalog = [Product(name=f"product-{i}", price=random.random() * 10000, available_amount=100) for i in range(50)]
+    carts = random_carts(500, catalog)
+
+    totals = calculate_totals(carts)
+
+    assert [float(total) for total in totals] == [cart.calculate_total() for cart in carts]
+
+
+# Тест 2: Знижки на окремі товари та округлення до копійок
+def test_batch_totals_with_discounts_and_rounding():
+    laptop = Product(name="Ноутбук", price=1000.005, available_amount=10)
+    mouse = Product(name="Мишка", price=20, available_amount=10)
+    cart = ShoppingCart()
+    cart.add_product(laptop, 1)
+    cart.add_product(mouse, 2)
+
+    totals = calculate_totals([cart, ShoppingCart()], discounts={mouse: 0.25}, decimals=2)
+
+    assert list(totals) == [round(1000.005 + 2 * 15, 2), 0.0]
+
+
+# Тест 3: Ціни Decimal і великі цілі рахуються точно, як у calculate_total
+def test_batch_totals_fall_back_for_exact_prices():
+    cheap = Product(name="Кабель", price=Decimal("0.10"), available_amount=10)
+    huge = Product(name="Сервер", price=2 ** 60 + 1, available_amount=10)
+    decimal_cart, int_cart = ShoppingCart(), ShoppingCart()
+    decimal_cart.add_product(cheap, 3)
+    int_cart.add_product(huge, 1)
+
+    assert list(calculate_totals([decimal_cart])) == [Decimal("0.30")]
+    assert list(calculate_totals([int_cart, ShoppingCart()])) == [2 ** 60 + 1, 0]
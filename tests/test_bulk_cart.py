@@ -0,0 +1,100 @@
+import pytest
+
+from app import CartValidationError
+from app.eshop import Product, ShoppingCart
+
+
+def make_products():
+    return (
+        Product(name="Ноутбук", price=25000, available_amount=5),
+        Product(name="Мишка", price=20, available_amount=30),
+        Product(name="Клавіатура", price=50, available_amount=2),
+    )
+
+
+# Тест 1: add_many додає всі рядки та сумує повтори
+def test_add_many_adds_all_lines():
+    laptop, mouse, keyboard = make_products()
+    cart = ShoppingCart()
+
+    cart.add_many([(laptop, 1), (mouse, 10), (mouse, 5), (keyboard, 2)])
+
+    assert cart.products == {laptop: 1, mouse: 15, keyboard: 2}
+    assert cart.calculate_total() == 25000 + 15 * 20 + 2 * 50
+
+
+# Тест 2: Некоректний рядок скасовує всю операцію та повідомляє про всі помилки
+def test_add_many_is_atomic_and_reports_all_failures():
+    laptop, mouse, keyboard = make_products()
+    cart = ShoppingCart()
+    cart.add_product(laptop, 1)
+
+    with pytest.raises(CartValidationError) as excinfo:
+        cart.add_many({mouse: 3, keyboard: 3, laptop: "2"})
+
+    assert cart.products == {laptop: 1}
+    assert [product for product, _ in excinfo.value.errors] == [laptop, keyboard]
+
+
+# Тест 3: update_many змінює лише товари, що вже є в кошику
+def test_update_many_requires_existing_lines():
+    laptop, mouse, keyboard = make_products()
+    cart = ShoppingCart()
+    cart.add_many({laptop: 1, mouse: 1})
+
+    cart.update_many({laptop: 3, mouse: 2})
+    assert cart.products == {laptop: 3, mouse: 2}
+
+    with pytest.raises(CartValidationError) as excinfo:
+        cart.update_many({laptop: 4, keyboard: 1})
+    assert excinfo.value.errors[0][0] == keyboard
+    assert cart.products[laptop] == 3
+
+
+# Тест 4: merge сумує кількості та не змінює інший кошик
+def test_merge_sums_quantities():
+    laptop, mouse, keyboard = make_products()
+    cart, guest_cart = ShoppingCart(), ShoppingCart()
+    cart.add_many({laptop: 1, mouse: 2})
+    guest_cart.add_many({mouse: 3, keyboard: 1})
+
+    cart.merge(guest_cart)
+
+    assert cart.products == {laptop: 1, mouse: 5, keyboard: 1}
+    assert guest_cart.products == {mouse: 3, keyboard: 1}
+
+    guest_cart.add_product(keyboard, 2)
+    with pytest.raises(CartValidationError):
+        cart.merge(guest_cart)
+    assert cart.products[keyboard] == 1
+
+
+# Тест 5: Пакетні зміни зберігають ціну на момент додавання
+def test_bulk_changes_keep_price_at_add():
+    laptop, mouse, _ = make_products()
+    cart, guest_cart = ShoppingCart(), ShoppingCart()
+    cart.add_product(laptop, 1)
+    guest_cart.add_product(mouse, 2)
+    laptop.price = 27000
+    mouse.price = 25
+
+    cart.update_many({laptop: 2})
+    cart.merge(guest_cart)
+
+    assert cart.added_prices == {laptop: 25000, mouse: 20}
+
+
+# Тест 6: add_product і add_many однаково фіксують поточну ціну для наявного рядка
+def test_add_paths_refresh_price_of_existing_line():
+    laptop, mouse, _ = make_products()
+    single_cart, bulk_cart = ShoppingCart(), ShoppingCart()
+    for cart in (single_cart, bulk_cart):
+        cart.add_product(laptop, 1)
+        cart.add_product(mouse, 1)
+    laptop.price = 27000
+
+    single_cart.add_product(laptop, 2)
+    bulk_cart.add_many({laptop: 2})
+
+    assert single_cart.added_prices == bulk_cart.added_prices == {laptop: 27000, mouse: 20}
+    assert single_cart.calculate_total() == bulk_cart.calculate_total() == 2 * 27000 + 20
@@ -0,0 +1,67 @@
+from app.eshop import Shipment
+from services import ShippingService, StatusCache
+from services.repository import ShippingRepository
+
+
+def make_repository(mocker):
+    mock_resource = mocker.Mock()
+    mock_resource.Table.return_value.name = "ShippingTable"
+    mocker.patch("services.repository.get_dynamodb_resource", return_value=mock_resource)
+    mocker.patch("services.repository.time.sleep")
+    return ShippingRepository(), mock_resource
+
+
+# Тест 1: Ідентифікатори дедуплікуються та діляться на пакети по 100 ключів
+def test_get_shipping_statuses_chunks_and_deduplicates(mocker):
+    repo, mock_resource = make_repository(mocker)
+
+    def batch_get_item(RequestItems):
+        keys = RequestItems["ShippingTable"]["Keys"]
+        return {"Responses": {"ShippingTable": [
+            {"shipping_id": key["shipping_id"], "shipping_status": "created"} for key in keys
+        ]}}
+
+    mock_resource.batch_get_item.side_effect = batch_get_item
+    shipping_ids = [f"id_{i}" for i in range(150)] + ["id_0", "id_1"]
+
+    statuses = repo.get_shipping_statuses(shipping_ids)
+
+    assert len(statuses) == 150
+    assert mock_resource.batch_get_item.call_count == 2
+    first_request = mock_resource.batch_get_item.call_args_list[0].kwargs["RequestItems"]["ShippingTable"]
+    assert len(first_request["Keys"]) == 100
+    assert first_request["ProjectionExpression"] == "shipping_id, shipping_status"
+
+
+# Тест 2: Необроблені ключі запитуються повторно
+def test_get_shipping_statuses_retries_unprocessed_keys(mocker):
+    repo, mock_resource = make_repository(mocker)
+    mock_resource.batch_get_item.side_effect = [
+        {
+            "Responses": {"ShippingTable": [{"shipping_id": "a", "shipping_status": "created"}]},
+            "UnprocessedKeys": {"ShippingTable": {"Keys": [{"shipping_id": "b"}]}},
+        },
+        {"Responses": {"ShippingTable": [{"shipping_id": "b", "shipping_status": "completed"}]}},
+    ]
+
+    statuses = repo.get_shipping_statuses(["a", "b"])
+
+    assert statuses == {"a": "created", "b": "completed"}
+    second_request = mock_resource.batch_get_item.call_args_list[1].kwargs["RequestItems"]
+    assert second_request == {"ShippingTable": {"Keys": [{"shipping_id": "b"}]}}
+
+
+# Тест 3: Shipment.check_many робить один пакетний запит і використовує кеш
+def test_check_many_uses_single_batch_and_cache(mocker):
+    mock_repo = mocker.Mock()
+    mock_repo.get_shipping_statuses.return_value = {"a": "created", "b": "in progress"}
+    cache = StatusCache(ttl_seconds=60)
+    cache.put("c", "completed")
+    shipping_service = ShippingService(mock_repo, mocker.Mock(), status_cache=cache)
+
+    shipments = [Shipment(shipping_id, shipping_service) for shipping_id in ["a", "b", "c", "a", "missing"]]
+    statuses = Shipment.check_many(shipments)
+
+    assert statuses == {"a": "created", "b": "in progress", "c": "completed", "missing": None}
+    mock_repo.get_shipping_statuses.assert_called_once_with(["a", "b", "missing"])
+    assert cache.get("a") == "created"
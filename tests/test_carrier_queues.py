@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from services import ShippingService, CarrierConsumerPool
+
+
+def make_service(mocker):
+    mock_repo = mocker.Mock()
+    mock_repo.create_shipping.return_value = "shipping_1"
+    carrier_publishers = {
+        shipping_type: mocker.Mock() for shipping_type in ShippingService.list_available_shipping_type()
+    }
+    return ShippingService(mock_repo, mocker.Mock(), carrier_publishers=carrier_publishers), mock_repo
+
+
+# Тест 1: Доставка потрапляє до черги свого перевізника
+def test_create_shipping_routes_to_carrier_queue(mocker):
+    shipping_service, _ = make_service(mocker)
+    shipping_type = ShippingService.list_available_shipping_type()[2]
+
+    shipping_service.create_shipping(
+        shipping_type, ["Product"], "order_1", datetime.now(timezone.utc) + timedelta(days=1)
+    )
+
+    shipping_service.carrier_publishers[shipping_type].send_new_shipping.assert_called_once_with("shipping_1")
+    shipping_service.publisher.send_new_shipping.assert_not_called()
+    for other_type, publisher in shipping_service.carrier_publishers.items():
+        if other_type != shipping_type:
+            publisher.send_new_shipping.assert_not_called()
+
+
+# Тест 2: Черги перевізників обробляються по черзі, помилка одного не зупиняє інших
+def test_consumer_pool_round_robin_isolates_failures(mocker):
+    shipping_service, mock_repo = make_service(mocker)
+    future_date = datetime.now(timezone.utc) + timedelta(days=1)
+    mock_repo.get_shipping.return_value = {'due_date': future_date.isoformat()}
+    mock_repo.update_shipping_status.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+
+    carriers = ShippingService.list_available_shipping_type()
+    for shipping_type, publisher in shipping_service.carrier_publishers.items():
+        publisher.poll_shipping.return_value = [f"{shipping_type}_1"]
+    shipping_service.carrier_publishers[carriers[0]].poll_shipping.side_effect = RuntimeError("SQS is down")
+
+    pool = CarrierConsumerPool(shipping_service, carrier_workers={carriers[1]: 3})
+    first = pool.run_once()
+    second = pool.run_once()
+
+    assert list(first) == carriers
+    assert list(second) == carriers[1:] + carriers[:1]
+    stats = pool.stats()
+    assert stats[carriers[0]]["errors"] == 2
+    assert stats[carriers[1]] == {"workers": 3, "processed": 2, "errors": 0}
+    assert stats[carriers[3]]["processed"] == 2
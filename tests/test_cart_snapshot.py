@@ -0,0 +1,57 @@
+import pytest
+
+from app.eshop import Product, ShoppingCart
+from app.snapshot import CartSnapshot, save_carts, LINE_RECORD
+
+
+def make_catalog():
+    return {name: Product(name=name, price=price, available_amount=100)
+            for name, price in [("Ноутбук", 25000), ("Мишка", 20), ("Клавіатура", 50)]}
+
+
+# Тест 1: Кошики відновлюються з тими самими кількостями та цінами на момент додавання
+def test_snapshot_round_trip(tmp_path):
+    catalog = make_catalog()
+    first = ShoppingCart()
+    first.add_product(catalog["Ноутбук"], 1)
+    first.add_product(catalog["Мишка"], 3)
+    catalog["Мишка"].price = 25
+    second = ShoppingCart()
+    second.add_product(catalog["Клавіатура"], 2)
+    path = tmp_path / "carts.bin"
+
+    assert save_carts(str(path), {"user-2": second, "user-1": first, "empty": ShoppingCart()}) == 3
+
+    with CartSnapshot(str(path)) as snapshot:
+        assert len(snapshot) == 3
+        assert list(snapshot.cart_ids()) == ["empty", "user-1", "user-2"]
+        restored = snapshot.load("user-1", catalog)
+        assert restored.products == {catalog["Ноутбук"]: 1, catalog["Мишка"]: 3}
+        assert restored.added_prices[catalog["Мишка"]] == 20
+        assert snapshot.load("user-2", catalog).products == {catalog["Клавіатура"]: 2}
+        assert snapshot.load("missing", catalog) is None
+
+
+# Тест 2: Рядки кошика мають фіксовану ширину
+def test_snapshot_uses_fixed_width_lines(tmp_path):
+    catalog = make_catalog()
+    carts = {}
+    for i in range(10):
+        cart = ShoppingCart()
+        cart.add_product(catalog["Мишка"], i + 1)
+        carts[f"cart-{i}"] = cart
+    small, large = tmp_path / "small.bin", tmp_path / "large.bin"
+    save_carts(str(small), dict(list(carts.items())[:5]))
+    save_carts(str(large), carts)
+
+    growth = large.stat().st_size - small.stat().st_size
+    assert growth == 5 * (16 + LINE_RECORD.size) + len("".join(f"cart-{i}" for i in range(5, 10)))
+
+
+# Тест 3: Невідомий файл відхиляється
+def test_snapshot_rejects_foreign_file(tmp_path):
+    path = tmp_path / "foreign.bin"
+    path.write_bytes(b"x" * 64)
+
+    with pytest.raises(ValueError):
+        CartSnapshot(str(path))
@@ -0,0 +1,58 @@
+import random
+import time
+
+from app.catalog import ProductCatalog
+from app.eshop import Product, ShoppingCart
+
+
+def make_catalog():
+    products = [
+        Product(name="Ноутбук Lenovo", price=25000, available_amount=3),
+        Product(name="ноутбук HP", price=18000, available_amount=0),
+        Product(name="Навушники", price=900, available_amount=10),
+        Product(name="Мишка", price=450, available_amount=1),
+    ]
+    return ProductCatalog(products), products
+
+
+# Тест 1: Пошук за префіксом не залежить від регістру кирилиці
+def test_prefix_search_is_case_insensitive():
+    catalog, products = make_catalog()
+
+    assert [p.name for p in catalog.search_prefix("НОУТ")] == ["ноутбук HP", "Ноутбук Lenovo"]
+    assert catalog.search_prefix("ноут", in_stock=True) == [products[0]]
+    assert catalog.search_prefix("на")[0].name == "Навушники"
+    assert catalog.search_prefix("планшет") == []
+
+
+# Тест 2: Діапазон цін та фільтр наявності оновлюються після buy/restock/update_price
+def test_price_range_updates_incrementally():
+    catalog, products = make_catalog()
+    laptop, laptop_hp, headphones, mouse = products
+
+    assert catalog.price_range(max_price=1000) == [mouse, headphones]
+
+    cart = ShoppingCart()
+    cart.add_product(mouse, 1)
+    cart.submit_cart_order()
+    assert catalog.price_range(max_price=1000, in_stock=True) == [headphones]
+
+    laptop_hp.restock(2)
+    laptop_hp.update_price(999)
+    assert catalog.price_range(max_price=1000, in_stock=True) == [headphones, laptop_hp]
+    assert catalog.price_range(min_price=20000) == [laptop]
+
+
+# Тест 3: Запити залишаються швидкими на великому каталозі
+def test_queries_stay_fast_on_large_catalog():
+    random.seed(1)
+    catalog = ProductCatalog(
+        Product(name=f"Товар {i:06d}", price=random.randint(1, 100000), available_amount=random.randint(0, 5))
+        for i in range(200000)
+    )
+
+    started = time.perf_counter()
+    for _ in range(100):
+        catalog.search_prefix("товар 1234", limit=20)
+        catalog.price_range(500, 510, in_stock=True, limit=20)
+    assert (time.perf_counter() - started) / 100 < 0.005
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from app.eshop import Product, ShoppingCart
+from app.eventlog import InventoryJournal, replay, LOG_FILE_NAME
+
+
+# Тест 1: Залишки й ціни відновлюються з журналу після перезапуску
+def test_replay_restores_stock_and_price(tmp_path):
+    journal = InventoryJournal(str(tmp_path), snapshot_every=0)
+    laptop = Product(name="Ноутбук", price=25000, available_amount=10)
+    mouse = Product(name="Мишка", price=20, available_amount=30)
+    journal.track(laptop)
+    journal.track(mouse)
+
+    cart = ShoppingCart()
+    cart.add_product(laptop, 3)
+    cart.add_product(mouse, 5)
+    fsyncs_before = journal.fsyncs
+    cart.submit_cart_order()
+    assert journal.fsyncs == fsyncs_before + 1
+    laptop.restock(4)
+    mouse.update_price(25)
+    journal.close()
+
+    products = replay(str(tmp_path))
+
+    assert products["Ноутбук"].available_amount == 11
+    assert products["Мишка"].available_amount == 25
+    assert products["Мишка"].price == 25
+
+
+# Тест 2: Знімок скорочує відтворення, а неповний хвіст журналу ігнорується
+def test_snapshot_and_torn_tail(tmp_path):
+    journal = InventoryJournal(str(tmp_path), snapshot_every=3)
+    product = Product(name="Клавіатура", price=50, available_amount=100)
+    journal.track(product)
+    for _ in range(5):
+        product.buy(1)
+    journal.close()
+    with open(tmp_path / LOG_FILE_NAME, "ab") as log_file:
+        log_file.write(b"\x40\x00\x00\x00partial")
+
+    assert (tmp_path / "snapshot.bin").exists()
+    reopened = InventoryJournal(str(tmp_path))
+    assert reopened.state["Клавіатура"][0] == 95
+    reopened.close()
+    catalog = {"Клавіатура": Product(name="Клавіатура", price=0, available_amount=0)}
+    assert replay(str(tmp_path), catalog)["Клавіатура"].available_amount == 95
+
+
+# Тест 3: Одночасні покупки з різних потоків не втрачаються
+def test_concurrent_appends_are_group_committed(tmp_path):
+    journal = InventoryJournal(str(tmp_path), snapshot_every=0)
+    product = Product(name="Мишка", price=20, available_amount=10000)
+    journal.track(product)
+    barrier = threading.Barrier(8)
+
+    def buy_many():
+        barrier.wait()
+        for _ in range(50):
+            journal.record_buy("Мишка", 1)
+
+    threads = [threading.Thread(target=buy_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.close()
+
+    assert replay(str(tmp_path))["Мишка"].available_amount == 10000 - 400
+
+
+# Тест 4: Невдалий fsync не оголошує події довговічними, а повторне скидання їх записує
+def test_failed_flush_is_retried_not_acknowledged(tmp_path, mocker):
+    journal = InventoryJournal(str(tmp_path), snapshot_every=0)
+    product = Product(name="Ноутбук", price=25000, available_amount=10)
+    journal.track(product)
+    durable_seq = journal._durable_seq
+    mocker.patch("app.eventlog.os.fsync", side_effect=[OSError("disk full"), None, None])
+
+    with pytest.raises(OSError):
+        journal.record_buy("Ноутбук", 2)
+    assert journal._durable_seq == durable_seq
+
+    journal.record_buy("Ноутбук", 1)
+    journal.close()
+
+    assert replay(str(tmp_path))["Ноутбук"].available_amount == 7
@@ -7,7 +7,7 @@ from services import ShippingService
 from services.repository import ShippingRepository
 from services.publisher import ShippingPublisher
 from datetime import datetime, timedelta, timezone
-from services.config import AWS_ENDPOINT_URL, AWS_REGION, SHIPPING_QUEUE
+from services.config import AWS_ENDPOINT_URL, AWS_REGION, SHIPPING_QUEUE, namespaced
 import pytest
 
 @pytest.mark.parametrize("order_id, shipping_id", [
@@ -90,7 +90,7 @@ def test_when_place_order_then_shipping_in_queue(dynamo_resource):
         aws_access_key_id="test",  # Добавляем фиктивный ключ доступа
         aws_secret_access_key="test"  # Добавляем фиктивный секретный ключ
     )
-    queue_url = sqs_client.get_queue_url(QueueName=SHIPPING_QUEUE)["QueueUrl"]
+    queue_url = sqs_client.get_queue_url(QueueName=namespaced(SHIPPING_QUEUE))["QueueUrl"]
     response = sqs_client.receive_message(
         QueueUrl=queue_url,
         MaxNumberOfMessages=1,
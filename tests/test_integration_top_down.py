@@ -7,7 +7,7 @@ from app.eshop import Product, ShoppingCart, Order, Shipment
 from services import ShippingService
 from services.repository import ShippingRepository
 from services.publisher import ShippingPublisher
-from services.config import AWS_ENDPOINT_URL, AWS_REGION, SHIPPING_QUEUE
+from services.config import AWS_ENDPOINT_URL, AWS_REGION, SHIPPING_QUEUE, namespaced
 
 
 # Тест 1: Розміщення замовлення з імітованим репозиторієм та видавцем
@@ -275,7 +275,7 @@ def test_order_places_message_in_sqs_queue():
         aws_secret_access_key="test"
     )
 
-    queue_url = sqs_client.get_queue_url(QueueName=SHIPPING_QUEUE)["QueueUrl"]
+    queue_url = sqs_client.get_queue_url(QueueName=namespaced(SHIPPING_QUEUE))["QueueUrl"]
 
     response = sqs_client.receive_message(
         QueueUrl=queue_url,
@@ -0,0 +1,29 @@
+from app.loadgen import arrival_times, build_shipping_service, percentile_ms, run_load
+
+
+# Тест 1: Розгін лінійно збільшує інтенсивність прибуття
+def test_arrival_times_ramp_up():
+    offsets = list(arrival_times(rate=100, duration=2, ramp_up=1))
+
+    assert 145 <= len(offsets) <= 150
+    assert sum(1 for offset in offsets if offset < 0.5) < sum(1 for offset in offsets if 0.5 <= offset < 1)
+    assert offsets == sorted(offsets)
+
+
+# Тест 2: Перцентилі рахуються методом найближчого рангу
+def test_percentile_nearest_rank():
+    latencies = [i / 1000 for i in range(1, 101)]
+
+    assert percentile_ms(latencies, 50) == 50
+    assert percentile_ms(latencies, 99) == 99
+    assert percentile_ms([], 50) is None
+
+
+# Тест 3: Наскрізний прогін на пам'ятевих бекендах без помилок
+def test_run_load_in_memory():
+    summary = run_load(build_shipping_service("memory"), rate=50, duration=0.5, users=5)
+
+    session = summary["stages"]["session"]
+    assert session["count"] >= 20
+    assert session["error_rate"] == 0.0
+    assert summary["stages"]["place_order"]["count"] == session["count"]
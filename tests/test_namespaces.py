@@ -0,0 +1,49 @@
+import pytest
+
+from services.config import SHIPPING_QUEUE, namespaced
+from services.provisioning import isolated_namespace, queue_names
+from services.publisher import ShippingPublisher
+from services.repository import ShippingRepository
+from services.resilience import ResilientCaller
+
+
+# Тест 1: Простір імен додається як префікс до таблиці та черг
+def test_namespace_prefixes_table_and_queues(mocker):
+    mocker.patch("services.repository.get_dynamodb_resource")
+    mock_client = mocker.Mock()
+    mock_client.create_queue.return_value = {"QueueUrl": "http://queue"}
+
+    repository = ShippingRepository(namespace="bench-1")
+    publisher = ShippingPublisher(client=mock_client, resilience=ResilientCaller("sqs"), namespace="bench-1")
+
+    repository.dynamo_resource.Table.assert_called_once_with("bench-1-ShippingTable")
+    mock_client.create_queue.assert_called_once_with(QueueName=f"bench-1-{SHIPPING_QUEUE}")
+    assert publisher.queue_name == namespaced(SHIPPING_QUEUE, "bench-1")
+    assert namespaced("ShippingTable", "") == "ShippingTable"
+
+
+# Тест 2: Ізольований простір імен створюється й видаляється автоматично
+def test_isolated_namespace_provisions_and_tears_down(mocker):
+    provision = mocker.patch("services.provisioning.provision")
+    teardown = mocker.patch("services.provisioning.teardown")
+
+    with isolated_namespace("soak", carrier_queues=True) as namespace:
+        assert namespace.startswith("soak-")
+        provision.assert_called_once_with(namespace, True)
+        teardown.assert_not_called()
+
+    teardown.assert_called_once_with(namespace, True)
+    assert len(queue_names(namespace, carrier_queues=True)) == 5
+
+
+# Тест 3: Частково створений простір імен видаляється, якщо створення завершилося помилкою
+def test_isolated_namespace_tears_down_when_provision_fails(mocker):
+    provision = mocker.patch("services.provisioning.provision", side_effect=RuntimeError("queue quota exceeded"))
+    teardown = mocker.patch("services.provisioning.teardown")
+
+    with pytest.raises(RuntimeError):
+        with isolated_namespace("soak"):
+            pytest.fail("the body must not run when provisioning fails")
+
+    namespace = provision.call_args.args[0]
+    teardown.assert_called_once_with(namespace, False)
@@ -0,0 +1,158 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import ShippingService
+from services.publisher import ShippingPublisher, pack_shipping_ids, PACK_VERSION_ATTRIBUTE, ATTEMPTS_ATTRIBUTE
+from services.resilience import ResilientCaller
+
+
+def make_publisher(mocker, packed=True):
+    mock_client = mocker.Mock()
+    mock_client.create_queue.return_value = {"QueueUrl": "http://queue"}
+    mock_client.send_message.return_value = {"MessageId": "m"}
+    publisher = ShippingPublisher(client=mock_client, resilience=ResilientCaller("sqs"), packed=packed)
+    return publisher, mock_client
+
+
+def as_received(mock_client, handles):
+    return {"Messages": [
+        {"ReceiptHandle": handle, "Body": call.kwargs["MessageBody"],
+         "MessageAttributes": {
+             name: {"StringValue": value["StringValue"]}
+             for name, value in call.kwargs.get("MessageAttributes", {}).items()
+         }}
+        for handle, call in zip(handles, mock_client.send_message.call_args_list)
+    ]}
+
+
+# Тест 1: Багато ідентифікаторів пакуються в кілька повідомлень у межах ліміту розміру
+def test_pack_respects_size_limit():
+    shipping_ids = [f"shipping-{index:04d}" for index in range(100)]
+
+    packs = pack_shipping_ids(shipping_ids, max_bytes=200)
+
+    assert all(len(pack.encode()) <= 200 for pack in packs)
+    assert [i for pack in packs for i in pack.split("\n")] == shipping_ids
+    assert len(packs) == 8
+    assert [len(pack.split("\n")) for pack in pack_shipping_ids(shipping_ids, max_ids=40)] == [40, 40, 20]
+
+
+# Тест 2: poll_shipping розпаковує пакети та звичайні повідомлення
+def test_poll_unpacks_packed_and_plain_messages(mocker):
+    publisher, mock_client = make_publisher(mocker)
+    assert publisher.send_new_shippings(["a", "b", "c"]) == []
+    assert mock_client.send_message.call_count == 1
+
+    received = as_received(mock_client, ["h1"])
+    received["Messages"].append({"ReceiptHandle": "h2", "Body": "d"})
+    received["Messages"].append({"ReceiptHandle": "h3", "Body": "x",
+                                 "MessageAttributes": {PACK_VERSION_ATTRIBUTE: {"StringValue": "99"}}})
+    mock_client.receive_message.return_value = received
+
+    assert publisher.poll_shipping() == ["a", "b", "c", "d"]
+
+
+# Тест 3: Частково оброблений пакет повторно надсилає лише необроблені ідентифікатори
+def test_partial_ack_requeues_only_pending_ids(mocker):
+    publisher, mock_client = make_publisher(mocker)
+    publisher.send_new_shippings(["a", "b", "c"])
+    mock_client.receive_message.return_value = as_received(mock_client, ["h1"])
+    mock_repo = mocker.Mock()
+    mock_repo.get_shipping.side_effect = [{"due_date": "2999-01-01T00:00:00+00:00"}, RuntimeError("DynamoDB is down")]
+    mock_repo.update_shipping_status.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+    shipping_service = ShippingService(mock_repo, publisher)
+
+    with pytest.raises(RuntimeError):
+        shipping_service.process_shipping_batch()
+
+    resent = {
+        call.kwargs["MessageBody"]: call.kwargs["MessageAttributes"].get(ATTEMPTS_ATTRIBUTE, {}).get("StringValue")
+        for call in mock_client.send_message.call_args_list[1:]
+    }
+    assert resent == {"b": "1", "c": None}
+    mock_client.delete_message.assert_called_once_with(QueueUrl="http://queue", ReceiptHandle="h1")
+
+
+# Тест 4: Повністю оброблене повідомлення видаляється з черги
+def test_full_ack_deletes_message(mocker):
+    publisher, mock_client = make_publisher(mocker, packed=False)
+    mock_client.receive_message.return_value = {"Messages": [{"ReceiptHandle": "h1", "Body": "a"}]}
+
+    assert publisher.poll_shipping() == ["a"]
+    publisher.ack_shipping(["a"])
+
+    mock_client.send_message.assert_not_called()
+    mock_client.delete_message.assert_called_once_with(QueueUrl="http://queue", ReceiptHandle="h1")
+    assert publisher._in_flight == {}
+
+
+# Тест 5: Замовлення групуються в пакети замість окремого повідомлення на кожну доставку
+def test_order_path_buffers_ids_into_packs(mocker):
+    publisher, mock_client = make_publisher(mocker)
+    publisher.linger_seconds = 60
+    mock_repo = mocker.Mock()
+    mock_repo.create_shipping.side_effect = [f"shipping_{index}" for index in range(60)]
+    mock_repo.update_shipping_status.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+    shipping_service = ShippingService(mock_repo, publisher)
+    due_date = datetime.now(timezone.utc) + timedelta(days=1)
+
+    for index in range(60):
+        shipping_service.create_shipping("Нова Пошта", ["p"], f"order_{index}", due_date)
+    assert mock_client.send_message.call_count == 1
+
+    shipping_service.shutdown()
+    bodies = [call.kwargs["MessageBody"].split("\n") for call in mock_client.send_message.call_args_list]
+    assert bodies == [[f"shipping_{index}" for index in range(50)], [f"shipping_{index}" for index in range(50, 60)]]
+
+
+# Тест 6: Неповний пакет надсилається після короткої затримки
+def test_partial_pack_is_sent_after_linger(mocker):
+    publisher, mock_client = make_publisher(mocker)
+    publisher.linger_seconds = 0.01
+    sent = threading.Event()
+    mock_client.send_message.side_effect = lambda **kwargs: sent.set() or {"MessageId": "m"}
+
+    publisher.send_new_shipping("a")
+
+    assert sent.wait(5)
+    assert mock_client.send_message.call_args.kwargs["MessageBody"] == "a"
+
+
+# Тест 7: Ідентифікатор, що постійно падає, потрапляє до черги недоставлених повідомлень
+def test_poison_id_is_dead_lettered(mocker):
+    publisher, mock_client = make_publisher(mocker)
+    mock_client.create_queue.return_value = {"QueueUrl": "http://dlq"}
+    mock_client.receive_message.return_value = {"Messages": [{
+        "ReceiptHandle": "h1", "Body": "b",
+        "Attributes": {"ApproximateReceiveCount": "2"},
+        "MessageAttributes": {PACK_VERSION_ATTRIBUTE: {"StringValue": "1"}, ATTEMPTS_ATTRIBUTE: {"StringValue": "4"}},
+    }]}
+
+    assert publisher.poll_shipping() == []
+
+    mock_client.create_queue.assert_called_with(QueueName=publisher.queue_name + "-dlq")
+    assert mock_client.send_message.call_args.kwargs["QueueUrl"] == "http://dlq"
+    mock_client.delete_message.assert_called_once_with(QueueUrl="http://queue", ReceiptHandle="h1")
+
+
+# Тест 8: Перший ідентифікатор пакета, що падає, відокремлюється, навіть якщо нічого не оброблено
+def test_failure_at_start_of_pack_splits_out_failed_id(mocker):
+    publisher, mock_client = make_publisher(mocker)
+    publisher.send_new_shippings(["a", "b", "c"])
+    mock_client.receive_message.return_value = as_received(mock_client, ["h1"])
+    mock_repo = mocker.Mock()
+    mock_repo.get_shipping.side_effect = RuntimeError("DynamoDB is down")
+    shipping_service = ShippingService(mock_repo, publisher)
+
+    with pytest.raises(RuntimeError):
+        shipping_service.process_shipping_batch()
+
+    resent = {
+        call.kwargs["MessageBody"]: call.kwargs["MessageAttributes"].get(ATTEMPTS_ATTRIBUTE, {}).get("StringValue")
+        for call in mock_client.send_message.call_args_list[1:]
+    }
+    assert resent == {"a": "1", "b\nc": None}
+    mock_client.delete_message.assert_called_once_with(QueueUrl="http://queue", ReceiptHandle="h1")
+    assert publisher._in_flight == {}
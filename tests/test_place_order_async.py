@@ -0,0 +1,148 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.eshop import Product, ShoppingCart, Order
+from services import ShippingService, AdmissionController, OverloadedError
+from services.memory import InMemoryShippingRepository, InMemoryShippingPublisher
+
+
+def make_cart(product):
+    cart = ShoppingCart()
+    cart.add_product(product, amount=2)
+    return cart
+
+
+# Тест 1: Товар списується одразу, а ID доставки приходить через Future
+def test_place_order_async_commits_inventory_before_shipping(mocker):
+    mock_repo = mocker.Mock()
+    mock_repo.create_shipping.return_value = "shipping_1"
+    mock_publisher = mocker.Mock()
+    release = threading.Event()
+    mock_publisher.send_new_shipping.side_effect = lambda shipping_id: release.wait(5)
+    shipping_service = ShippingService(mock_repo, mock_publisher)
+    product = Product(name="Laptop", price=1200, available_amount=5)
+    callback = mocker.Mock()
+
+    future = Order(make_cart(product), shipping_service, "order_1").place_order_async(
+        ShippingService.list_available_shipping_type()[0],
+        due_date=datetime.now(timezone.utc) + timedelta(days=1),
+        callback=callback
+    )
+
+    assert product.available_amount == 3
+    assert not future.done()
+    release.set()
+    assert future.result(timeout=5) == "shipping_1"
+    mock_publisher.send_new_shipping.assert_called_once_with("shipping_1")
+    mock_repo.update_shipping_status_if.assert_called_once_with(
+        "shipping_1", ShippingService.SHIPPING_IN_PROGRESS, ShippingService.SHIPPING_CREATED
+    )
+    shipping_service.shutdown()
+    callback.assert_called_once_with(future)
+
+
+# Тест 2: Некоректний тип доставки відхиляється до списання товару
+def test_place_order_async_validates_before_commit(mocker):
+    shipping_service = ShippingService(mocker.Mock(), mocker.Mock())
+    product = Product(name="Mouse", price=20, available_amount=5)
+
+    with pytest.raises(ValueError):
+        Order(make_cart(product), shipping_service).place_order_async(
+            "Invalid Shipping Type", due_date=datetime.now(timezone.utc) + timedelta(days=1)
+        )
+
+    assert product.available_amount == 5
+
+
+# Тест 3: Доставка, завершена споживачем раніше, не повертається в "in progress"
+def test_pipelined_status_update_does_not_overwrite_completion():
+    completed = threading.Event()
+
+    class RacingRepository(InMemoryShippingRepository):
+        def update_shipping_status_if(self, shipping_id, status, expected_status):
+            completed.wait(5)
+            return super().update_shipping_status_if(shipping_id, status, expected_status)
+
+    class ConsumingPublisher(InMemoryShippingPublisher):
+        def send_new_shipping(self, shipping_id):
+            shipping_service.complete_shipping(shipping_id)
+            completed.set()
+            return "message_1"
+
+    shipping_service = ShippingService(RacingRepository(), ConsumingPublisher())
+
+    shipping_id = shipping_service.create_shipping_async(
+        "Нова Пошта", ["Mouse"], "order_1", datetime.now(timezone.utc) + timedelta(days=1)
+    ).result(timeout=5)
+    shipping_service.shutdown()
+
+    assert completed.is_set()
+    assert shipping_service.check_status(shipping_id) == ShippingService.SHIPPING_COMPLETED
+
+
+# Тест 4: Якщо доставку не створено, списаний товар повертається на склад
+def test_failed_async_shipping_restocks_products(mocker):
+    mock_repo = mocker.Mock()
+    mock_repo.create_shipping.side_effect = RuntimeError("DynamoDB is down")
+    shipping_service = ShippingService(mock_repo, mocker.Mock())
+    product = Product(name="Laptop", price=1200, available_amount=5)
+
+    future = Order(make_cart(product), shipping_service).place_order_async(
+        ShippingService.list_available_shipping_type()[0],
+        due_date=datetime.now(timezone.utc) + timedelta(days=1)
+    )
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+    shipping_service.shutdown()
+
+    assert product.available_amount == 5
+
+
+# Тест 5: Перевантажений сервіс відхиляє асинхронне замовлення до списання товару
+def test_place_order_async_rejected_before_commit_when_saturated(mocker):
+    controller = AdmissionController(initial_limit=1, max_queue=0)
+    mock_repo = mocker.Mock()
+    mock_repo.create_shipping.return_value = "shipping_1"
+    shipping_service = ShippingService(mock_repo, mocker.Mock(), admission_controller=controller)
+    product = Product(name="Laptop", price=1200, available_amount=5)
+    due_date = datetime.now(timezone.utc) + timedelta(days=1)
+    shipping_type = ShippingService.list_available_shipping_type()[0]
+
+    slot = controller.acquire()
+    with pytest.raises(OverloadedError):
+        Order(make_cart(product), shipping_service).place_order_async(shipping_type, due_date=due_date)
+    assert product.available_amount == 5
+    slot.release()
+
+    future = Order(make_cart(product), shipping_service).place_order_async(shipping_type, due_date=due_date)
+    assert future.result(timeout=5) == "shipping_1"
+    shipping_service.shutdown()
+    assert controller.stats()["admitted"] == 2
+    assert controller.stats()["in_flight"] == 0
+
+
+# Тест 6: Зупинка сервісу не обриває доставку, що вже створюється
+def test_shutdown_does_not_break_running_pipeline(mocker):
+    mock_repo = mocker.Mock()
+    started = threading.Event()
+    release = threading.Event()
+
+    def create_shipping(*args):
+        started.set()
+        release.wait(5)
+        return "shipping_1"
+
+    mock_repo.create_shipping.side_effect = create_shipping
+    shipping_service = ShippingService(mock_repo, mocker.Mock())
+    future = shipping_service.create_shipping_async(
+        ShippingService.list_available_shipping_type()[0], ["Mouse"], "order_1",
+        datetime.now(timezone.utc) + timedelta(days=1)
+    )
+    started.wait(5)
+
+    shipping_service.shutdown(wait=False)
+    release.set()
+
+    assert future.result(timeout=5) == "shipping_1"
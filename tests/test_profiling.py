@@ -0,0 +1,65 @@
+import os
+import signal
+import time
+
+from app.eshop import Product, ShoppingCart
+from services import profiling
+from services.profiling import SamplingProfiler
+
+
+def slow_total(cart):
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        cart.calculate_total()
+
+
+# Тест 1: Профілювальник записує стеки точок входу та звіт про виділення пам'яті
+def test_profiler_writes_collapsed_stacks_and_allocations(tmp_path):
+    profiler = SamplingProfiler(output_dir=str(tmp_path), interval=0.001)
+    cart = ShoppingCart()
+    for i in range(2000):
+        cart.add_product(Product(name=f"Product {i}", price=20, available_amount=5), 1)
+
+    assert profiler.start(duration=10)
+    assert not profiler.start(duration=10)
+    slow_total(cart)
+    stacks_path, allocations_path = profiler.stop()
+
+    lines = open(stacks_path, encoding="utf-8").read().splitlines()
+    assert lines
+    assert all(line.startswith("ShoppingCart.calculate_total;") for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert open(allocations_path, encoding="utf-8").read()
+
+
+# Тест 2: Без активного вікна точки входу не відстежуються
+def test_profiled_is_passthrough_when_disabled():
+    cart = ShoppingCart()
+    cart.add_product(Product(name="Mouse", price=20, available_amount=5), 2)
+
+    assert cart.calculate_total() == 40
+    assert not profiling._active_entries
+
+
+# Тест 3: Сигнал під час утримання блокування профілювальника не блокує головний потік
+def test_signal_while_profiler_lock_is_held_does_not_deadlock(mocker, tmp_path):
+    sampling_profiler = SamplingProfiler(output_dir=str(tmp_path), interval=0.001)
+    mocker.patch.object(profiling, "profiler", sampling_profiler)
+    mocker.patch.object(profiling, "PROFILE_ENABLED", True)
+    mocker.patch.object(profiling, "PROFILE_ON_START", False)
+    mocker.patch.object(profiling, "_installed", False)
+    previous_handler = signal.getsignal(signal.SIGUSR2)
+    try:
+        profiling.install_from_env()
+        with sampling_profiler._lock:
+            os.kill(os.getpid(), signal.SIGUSR2)
+            time.sleep(0.05)
+            assert not sampling_profiler.running
+
+        deadline = time.monotonic() + 2
+        while not sampling_profiler.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sampling_profiler.running
+        sampling_profiler.stop()
+    finally:
+        signal.signal(signal.SIGUSR2, previous_handler)
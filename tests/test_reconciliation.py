@@ -0,0 +1,81 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from services import ShippingService
+from services.reconciliation import ShippingReconciler, ReconciliationCheckpoint
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def stuck_item(shipping_id, status, due_in):
+    return {
+        "shipping_id": shipping_id,
+        "shipping_type": "Нова Пошта",
+        "shipping_status": status,
+        "created_date": (NOW - timedelta(hours=2)).isoformat(),
+        "due_date": (NOW + due_in).isoformat(),
+    }
+
+
+def make_service(mocker, pages_by_segment):
+    mock_repo = mocker.Mock()
+    mock_repo.scan_segment.side_effect = lambda segment, total, **kwargs: iter(pages_by_segment[segment])
+    mock_publisher = mocker.Mock()
+    mock_publisher.send_new_shippings.return_value = []
+    mock_repo.update_shipping_status_if.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+    return ShippingService(mock_repo, mock_publisher), mock_repo, mock_publisher
+
+
+# Тест 1: Прострочені доставки позначаються невдалими, решта повторно ставиться в чергу
+def test_reconciler_requeues_and_fails_stuck_shipments(mocker):
+    pages = {
+        0: [([stuck_item("a", "created", timedelta(days=1))], {"shipping_id": "a"}),
+            ([stuck_item("b", "in progress", timedelta(days=-1))], None)],
+        1: [([stuck_item("c", "in progress", timedelta(days=1))], None)],
+    }
+    shipping_service, mock_repo, mock_publisher = make_service(mocker, pages)
+
+    stats = ShippingReconciler(shipping_service, total_segments=2, batch_size=10).run(now=NOW)
+
+    assert stats["stuck"] == 3
+    assert stats["failed"] == 1
+    assert stats["requeued"] == 2
+    mock_repo.update_shipping_status_if.assert_any_call("b", ShippingService.SHIPPING_FAILED, "in progress")
+    mock_repo.update_shipping_status_if.assert_any_call(
+        "a", ShippingService.SHIPPING_IN_PROGRESS, ShippingService.SHIPPING_CREATED
+    )
+    sent_ids = sorted(i for call in mock_publisher.send_new_shippings.call_args_list for i in call.args[0])
+    assert sent_ids == ["a", "c"]
+    assert mock_repo.scan_segment.call_args.kwargs["projection"]
+
+
+# Тест 2: Завершені сегменти пропускаються, незавершені продовжуються з контрольної точки
+def test_reconciler_resumes_from_checkpoint(mocker, tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    checkpoint_path.write_text(json.dumps({
+        "0": {"start_key": None, "done": True},
+        "1": {"start_key": {"shipping_id": "x"}, "done": False},
+    }))
+    pages = {1: [([stuck_item("d", "in progress", timedelta(days=1))], None)]}
+    shipping_service, mock_repo, _ = make_service(mocker, pages)
+
+    ShippingReconciler(
+        shipping_service, total_segments=2, checkpoint=ReconciliationCheckpoint(str(checkpoint_path))
+    ).run(now=NOW)
+
+    assert mock_repo.scan_segment.call_count == 1
+    assert mock_repo.scan_segment.call_args.kwargs["start_key"] == {"shipping_id": "x"}
+    assert json.loads(checkpoint_path.read_text())["1"] == {"start_key": None, "done": True}
+
+
+# Тест 3: Доставка, завершена після сканування, не перезаписується
+def test_reconciler_skips_shipments_changed_since_scan(mocker):
+    pages = {0: [([stuck_item("e", "in progress", timedelta(days=-1))], None)]}
+    shipping_service, mock_repo, _ = make_service(mocker, pages)
+    mock_repo.update_shipping_status_if.return_value = None
+
+    stats = ShippingReconciler(shipping_service, total_segments=1).run(now=NOW)
+
+    assert stats["skipped"] == 1
+    assert stats.get("failed", 0) == 0
+    mock_repo.update_shipping_status.assert_not_called()
@@ -0,0 +1,140 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from services.resilience import (
+    AdaptiveTokenBucket, CircuitBreaker, CircuitOpenError, DeadlineExceededError, ResilientCaller,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def client_error(code, status=400):
+    return ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "GetItem")
+
+
+def make_caller(clock, **kwargs):
+    return ResilientCaller(
+        "dynamodb",
+        rate_limiter=AdaptiveTokenBucket(rate=100, capacity=100, clock=clock),
+        circuit_breaker=CircuitBreaker(failure_threshold=kwargs.pop("failure_threshold", 5),
+                                       reset_timeout=30, clock=clock),
+        clock=clock, sleep=clock.sleep, **kwargs
+    )
+
+
+# Тест 1: Тротлінг повторюється з відступом та знижує ліміт запитів
+def test_throttled_call_is_retried_and_rate_adapts(mocker):
+    clock = FakeClock()
+    caller = make_caller(clock)
+    operation = mocker.Mock(side_effect=[client_error("ProvisionedThroughputExceededException"), {"Item": {}}])
+
+    assert caller.call(operation, Key={"shipping_id": "a"}) == {"Item": {}}
+
+    assert operation.call_count == 2
+    stats = caller.stats()
+    assert stats["throttles"] == 1
+    assert stats["retries"] == 1
+    assert stats["rate_limit_per_second"] < 100
+
+
+# Тест 2: Помилки валідації не повторюються
+def test_non_retryable_error_is_raised_immediately(mocker):
+    caller = make_caller(FakeClock())
+    operation = mocker.Mock(side_effect=client_error("ValidationException"))
+
+    with pytest.raises(ClientError):
+        caller.call(operation)
+
+    assert operation.call_count == 1
+    assert caller.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+# Тест 3: Запобіжник відкривається після серії збоїв і пропускає пробний запит після паузи
+def test_circuit_breaker_opens_and_recovers(mocker):
+    clock = FakeClock()
+    caller = make_caller(clock, failure_threshold=2, max_attempts=1)
+    failing = mocker.Mock(side_effect=client_error("InternalServerError", 500))
+
+    for _ in range(2):
+        with pytest.raises(ClientError):
+            caller.call(failing)
+
+    with pytest.raises(CircuitOpenError):
+        caller.call(mocker.Mock())
+    assert caller.stats()["circuit_state"] == CircuitBreaker.OPEN
+
+    clock.now += 31
+    assert caller.call(mocker.Mock(return_value="ok")) == "ok"
+    assert caller.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+# Тест 4: Повтори не виходять за межі дедлайну операції
+def test_retries_respect_deadline(mocker):
+    clock = FakeClock()
+    caller = make_caller(clock, max_attempts=100, base_delay=1, max_delay=1, deadline=0.5)
+    mocker.patch("services.resilience.random.uniform", return_value=1)
+    operation = mocker.Mock(side_effect=client_error("ThrottlingException"))
+
+    with pytest.raises(DeadlineExceededError):
+        caller.call(operation)
+
+    assert operation.call_count == 1
+
+
+# Тест 5: Запити, відхилені за дедлайном, не залишають боргу в лімітері
+def test_deadline_rejections_do_not_consume_tokens(mocker):
+    clock = FakeClock()
+    caller = ResilientCaller(
+        "dynamodb", rate_limiter=AdaptiveTokenBucket(rate=10, capacity=10, clock=clock),
+        clock=clock, sleep=clock.sleep, deadline=1
+    )
+    for _ in range(200):
+        try:
+            caller.call(mocker.Mock())
+        except DeadlineExceededError:
+            pass
+
+    assert caller.rate_limiter.tokens >= -10
+    clock.now += 5
+    assert caller.call(mocker.Mock(return_value="ok")) == "ok"
+
+
+# Тест 6: Пробний запит, що не дочекався ліміту, не блокує запобіжник назавжди
+def test_probe_rejected_by_deadline_does_not_lock_breaker(mocker):
+    clock = FakeClock()
+    caller = make_caller(clock, failure_threshold=1, max_attempts=1, deadline=0.5)
+    with pytest.raises(ClientError):
+        caller.call(mocker.Mock(side_effect=client_error("InternalServerError", 500)))
+
+    clock.now += 31
+    caller.rate_limiter.tokens, caller.rate_limiter._updated_at = -100, clock.now
+    with pytest.raises(DeadlineExceededError):
+        caller.call(mocker.Mock())
+
+    clock.now += 2
+    assert caller.call(mocker.Mock(return_value="ok")) == "ok"
+    assert caller.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+# Тест 7: Відкритий запобіжник відхиляє виклик одразу, не чекаючи на лімітер
+def test_open_breaker_fails_fast_without_waiting(mocker):
+    clock = FakeClock()
+    caller = make_caller(clock, failure_threshold=1, max_attempts=1)
+    with pytest.raises(ClientError):
+        caller.call(mocker.Mock(side_effect=client_error("InternalServerError", 500)))
+    caller.rate_limiter.tokens, caller.rate_limiter._updated_at = -50, clock.now
+
+    with pytest.raises(CircuitOpenError):
+        caller.call(mocker.Mock())
+
+    assert clock.now == 0
+    assert caller.rate_limiter.tokens == -50
@@ -0,0 +1,57 @@
+import pytest
+
+from app.eshop import Product, ShoppingCart
+from app.revalidation import CartRegistry, ProductUpdate, apply_price_and_stock_updates
+
+
+def make_carts():
+    registry = CartRegistry()
+    laptop = Product(name="Ноутбук", price=25000, available_amount=5)
+    mouse = Product(name="Мишка", price=20, available_amount=10)
+    keyboard = Product(name="Клавіатура", price=50, available_amount=10)
+    with_laptop, with_mouse = ShoppingCart(), ShoppingCart()
+    registry.register(with_laptop)
+    registry.register(with_mouse)
+    with_laptop.add_product(laptop, 2)
+    with_mouse.add_product(mouse, 3)
+    return registry, (laptop, mouse, keyboard), (with_laptop, with_mouse)
+
+
+# Тест 1: Переоцінюються лише кошики зі зміненими товарами
+def test_only_affected_carts_are_repriced(mocker):
+    registry, (laptop, mouse, keyboard), (with_laptop, with_mouse) = make_carts()
+    spy = mocker.spy(registry, "revalidate")
+
+    results = apply_price_and_stock_updates(
+        [ProductUpdate(laptop, price=24000), ProductUpdate(keyboard, restock=5)], registry
+    )
+
+    assert spy.call_count == 1
+    assert len(results) == 1
+    assert results[0].cart is with_laptop
+    assert (results[0].old_total, results[0].new_total) == (50000, 48000)
+    assert laptop.version == 1 and mouse.version == 0 and keyboard.version == 1
+
+
+# Тест 2: Некоректний пакет не змінює жодного товару
+def test_invalid_batch_is_rejected_atomically():
+    registry, (laptop, mouse, _), _ = make_carts()
+
+    with pytest.raises(ValueError) as excinfo:
+        apply_price_and_stock_updates(
+            [ProductUpdate(laptop, price=100), ProductUpdate(mouse, price=0), ProductUpdate(mouse, restock=-1)],
+            registry
+        )
+
+    assert laptop.price == 25000
+    assert "price must be greater than zero" in str(excinfo.value)
+    assert "restock amount must not be negative" in str(excinfo.value)
+
+
+# Тест 3: Оформлений кошик видаляється зі зворотного індексу
+def test_submitted_cart_leaves_reverse_index():
+    registry, (laptop, _, _), (with_laptop, _) = make_carts()
+
+    with_laptop.submit_cart_order()
+
+    assert registry.carts_with(laptop) == []
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+from services import ShippingService, ShardedCounters
+from services.resilience import ResilientCaller
+
+
+def make_counters(mocker, shards=4, **kwargs):
+    shard_counts = {}
+    resource = mocker.patch("services.counters.get_dynamodb_resource").return_value
+    table = resource.Table.return_value
+    table.name = "ShippingCounters"
+
+    def update_item(Key, ExpressionAttributeValues, **_):
+        shard_key = Key["counter_key"]
+        shard_counts[shard_key] = shard_counts.get(shard_key, 0) + ExpressionAttributeValues[":amount"]
+
+    def batch_get_item(RequestItems):
+        keys = [key["counter_key"] for key in RequestItems["ShippingCounters"]["Keys"]]
+        return {"Responses": {"ShippingCounters": [
+            {"counter_key": key, "count": shard_counts[key]} for key in keys if key in shard_counts
+        ]}}
+
+    table.update_item.side_effect = update_item
+    resource.batch_get_item.side_effect = batch_get_item
+    counters = ShardedCounters(shards=shards, resilience=ResilientCaller("dynamodb"), **kwargs)
+    return counters, shard_counts, resource
+
+
+# Тест 1: Записи розподіляються по шардах, а читання їх підсумовує
+def test_increments_spread_over_shards_and_aggregate(mocker):
+    counters, shard_counts, _ = make_counters(mocker, shards=4)
+
+    for _ in range(200):
+        counters.increment("status:created")
+
+    assert len(shard_counts) == 4
+    assert counters.read(["status:created", "status:failed"]) == {"status:created": 200, "status:failed": 0}
+
+
+# Тест 2: Агреговані значення кешуються на короткий час
+def test_read_is_cached_until_ttl_expires(mocker):
+    now = [0.0]
+    counters, _, resource = make_counters(mocker, cache_ttl_seconds=2, clock=lambda: now[0])
+    counters.increment("carrier:Нова Пошта")
+
+    assert counters.read(["carrier:Нова Пошта"]) == {"carrier:Нова Пошта": 1}
+    counters.increment("carrier:Нова Пошта")
+    assert counters.read(["carrier:Нова Пошта"]) == {"carrier:Нова Пошта": 1}
+    assert resource.batch_get_item.call_count == 1
+
+    now[0] = 3.0
+    assert counters.read(["carrier:Нова Пошта"]) == {"carrier:Нова Пошта": 2}
+
+
+# Тест 3: Переходи статусів оновлюють лічильники у фоні, а збій лічильника не ламає доставку
+def test_service_transitions_update_counters(mocker):
+    counters, _, _ = make_counters(mocker, flush_interval=60)
+    update_item = counters.table.update_item.side_effect
+    mock_repo = mocker.Mock()
+    mock_repo.create_shipping.return_value = "shipping_1"
+    mock_repo.update_shipping_status.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+    shipping_service = ShippingService(mock_repo, mocker.Mock(), counters=counters)
+    shipping_type = ShippingService.list_available_shipping_type()[1]
+
+    counters.table.update_item.side_effect = RuntimeError("DynamoDB is down")
+    shipping_service.create_shipping(shipping_type, ["p1"], "order_1", datetime.now(timezone.utc) + timedelta(days=1))
+    shipping_service.complete_shipping("shipping_1")
+    assert shipping_service.fail_shipping("shipping_2") == {'HTTPStatusCode': 200}
+    counters.table.update_item.assert_not_called()
+
+    counters.flush()
+    assert counters.write_errors == 4
+    counters.table.update_item.side_effect = update_item
+    shipping_service.shutdown()
+
+    stats = shipping_service.shipping_stats()
+    assert stats["statuses"] == {"created": 1, "completed": 1, "failed": 1}
+    assert stats["carriers"][shipping_type] == 1
+
+
+# Тест 4: close зупиняє фоновий запис, повідомляє про незаписані дельти, а record після close перезапускає його
+def test_close_stops_flusher_and_reports_unwritten_deltas(mocker, caplog):
+    counters, shard_counts, _ = make_counters(mocker, flush_interval=60)
+    update_item = counters.table.update_item.side_effect
+
+    counters.record("status:created")
+    flusher = counters._flusher
+    counters.table.update_item.side_effect = RuntimeError("DynamoDB is down")
+
+    assert counters.close() == {"status:created": 1}
+    assert not flusher.is_alive()
+    assert counters._flusher is None
+    assert "could not be written on close" in caplog.text
+
+    counters.table.update_item.side_effect = update_item
+    counters.record("status:created")
+    assert counters._flusher is not flusher and counters._flusher.is_alive()
+    assert counters.close() == {}
+    assert sum(shard_counts.values()) == 2
@@ -0,0 +1,63 @@
+import multiprocessing
+
+import pytest
+
+from app.eshop import Product, ShoppingCart
+from app.shared_inventory import SharedInventory
+
+
+def buy_until_sold_out(inventory, results):
+    product = Product(name="Мишка", price=20, available_amount=0)
+    product.inventory = inventory
+    bought = 0
+    while True:
+        cart = ShoppingCart()
+        try:
+            cart.add_product(product, 1)
+            cart.submit_cart_order()
+        except ValueError:
+            break
+        bought += 1
+    results.put(bought)
+    inventory.close()
+
+
+@pytest.fixture
+def inventory():
+    shared = SharedInventory({"Мишка": 300, "Ноутбук": 2}, context=multiprocessing.get_context("fork"))
+    yield shared
+    shared.close()
+    shared.unlink()
+
+
+# Тест 1: Покупки з кількох процесів не перевищують спільного залишку
+def test_processes_never_oversell(inventory):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=buy_until_sold_out, args=(inventory, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    bought = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert sum(bought) == 300
+    assert inventory.get("Мишка") == 0
+
+
+# Тест 2: Кошик списує всі рядки або жодного
+def test_cart_submission_is_all_or_nothing(inventory):
+    mouse = Product(name="Мишка", price=20, available_amount=300)
+    laptop = Product(name="Ноутбук", price=25000, available_amount=2)
+    mouse.inventory = laptop.inventory = inventory
+    cart = ShoppingCart()
+    cart.add_product(mouse, 5)
+    cart.add_product(laptop, 2)
+    inventory.decrement("Ноутбук", 1)
+
+    with pytest.raises(ValueError):
+        cart.submit_cart_order()
+
+    assert inventory.get("Мишка") == 300
+    assert inventory.get("Ноутбук") == 1
+    assert cart.contains_product(mouse)
@@ -0,0 +1,88 @@
+import uuid
+
+from app.eshop import Shipment
+from services import ShippingService, StatusCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Тест 1: Повторна перевірка статусу береться з кешу
+def test_check_status_uses_cache_on_repeated_reads(mocker):
+    mock_repo = mocker.Mock()
+    mock_repo.get_shipping_status.return_value = ShippingService.SHIPPING_IN_PROGRESS
+    cache = StatusCache(ttl_seconds=10)
+    shipping_service = ShippingService(mock_repo, mocker.Mock(), status_cache=cache)
+
+    shipping_id = str(uuid.uuid4())
+    shipment = Shipment(shipping_id, shipping_service)
+
+    assert shipment.check_shipping_status() == ShippingService.SHIPPING_IN_PROGRESS
+    assert shipment.check_shipping_status() == ShippingService.SHIPPING_IN_PROGRESS
+
+    mock_repo.get_shipping_status.assert_called_once_with(shipping_id)
+    mock_repo.get_shipping.assert_not_called()
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+# Тест 2: Запис кешу застаріває після TTL
+def test_cache_entry_expires_after_ttl(mocker):
+    clock = FakeClock()
+    mock_repo = mocker.Mock()
+    mock_repo.get_shipping_status.return_value = ShippingService.SHIPPING_IN_PROGRESS
+    shipping_service = ShippingService(mock_repo, mocker.Mock(), status_cache=StatusCache(ttl_seconds=5, clock=clock))
+
+    shipping_service.check_status("shipping_1")
+    clock.now = 6
+    shipping_service.check_status("shipping_1")
+
+    assert mock_repo.get_shipping_status.call_count == 2
+
+
+# Тест 3: Власні зміни статусу сервісом інвалідовують кеш
+def test_status_write_invalidates_cache(mocker):
+    mock_repo = mocker.Mock()
+    mock_repo.get_shipping_status.side_effect = [
+        ShippingService.SHIPPING_IN_PROGRESS,
+        ShippingService.SHIPPING_COMPLETED,
+    ]
+    mock_repo.update_shipping_status.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+    shipping_service = ShippingService(mock_repo, mocker.Mock(), status_cache=StatusCache(ttl_seconds=60))
+
+    assert shipping_service.check_status("shipping_1") == ShippingService.SHIPPING_IN_PROGRESS
+    shipping_service.complete_shipping("shipping_1")
+    assert shipping_service.check_status("shipping_1") == ShippingService.SHIPPING_COMPLETED
+
+
+# Тест 4: Найстаріші записи витісняються при переповненні
+def test_cache_evicts_least_recently_used():
+    cache = StatusCache(ttl_seconds=60, max_size=2)
+    cache.put("a", "created")
+    cache.put("b", "created")
+    cache.get("a")
+    cache.put("c", "created")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "created"
+    assert cache.stats()["evictions"] == 1
+
+
+# Тест 5: Завантаження, що перетнулося з інвалідацією, не повертає застарілий статус у кеш
+def test_load_overlapping_invalidation_is_not_cached():
+    cache = StatusCache(ttl_seconds=60)
+
+    def slow_loader(shipping_id):
+        cache.invalidate(shipping_id)
+        return ShippingService.SHIPPING_IN_PROGRESS
+
+    assert cache.get_or_load("a", slow_loader) == ShippingService.SHIPPING_IN_PROGRESS
+    assert cache.get("a") is None
+    assert cache.get_or_load("a", lambda shipping_id: ShippingService.SHIPPING_COMPLETED) == \
+        ShippingService.SHIPPING_COMPLETED
+    assert cache.get("a") == ShippingService.SHIPPING_COMPLETED
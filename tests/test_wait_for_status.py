@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from app.eshop import Shipment
+from services import ShippingService
+from services.waiter import StatusWaiter
+
+
+def make_service(mocker, statuses):
+    mock_repo = mocker.Mock()
+    mock_repo.get_shipping_statuses.side_effect = lambda ids: {i: statuses.get(i) for i in ids}
+    shipping_service = ShippingService(mock_repo, mocker.Mock())
+    shipping_service._status_waiter = StatusWaiter(shipping_service, initial_delay=0.01, max_delay=0.02)
+    return shipping_service, mock_repo
+
+
+# Тест 1: Очікування завершується, коли доставка виходить зі статусу "in progress"
+def test_wait_for_status_returns_when_target_reached(mocker):
+    statuses = {"a": ShippingService.SHIPPING_IN_PROGRESS}
+    shipping_service, mock_repo = make_service(mocker, statuses)
+    calls = {"count": 0}
+
+    def load(ids):
+        calls["count"] += 1
+        if calls["count"] >= 3:
+            statuses["a"] = ShippingService.SHIPPING_COMPLETED
+        return {i: statuses.get(i) for i in ids}
+
+    mock_repo.get_shipping_statuses.side_effect = load
+
+    status = Shipment("a", shipping_service).wait_for_status(
+        [ShippingService.SHIPPING_COMPLETED, ShippingService.SHIPPING_FAILED], timeout=5
+    )
+
+    assert status == ShippingService.SHIPPING_COMPLETED
+
+
+# Тест 2: Тайм-аут, якщо статус не змінюється
+def test_wait_for_status_times_out(mocker):
+    shipping_service, _ = make_service(mocker, {"a": ShippingService.SHIPPING_IN_PROGRESS})
+
+    with pytest.raises(FutureTimeoutError):
+        Shipment("a", shipping_service).wait_for_status([ShippingService.SHIPPING_COMPLETED], timeout=0.1)
+
+    assert shipping_service.status_waiter.pending_count() == 0
+
+
+# Тест 3: Багато очікувачів обслуговуються одним пакетним опитуванням
+def test_many_async_waiters_share_bulk_polls(mocker):
+    statuses = {f"id_{i}": ShippingService.SHIPPING_COMPLETED for i in range(20)}
+    shipping_service, mock_repo = make_service(mocker, statuses)
+    shipments = [Shipment(shipping_id, shipping_service) for shipping_id in statuses]
+
+    async def wait_all():
+        return await asyncio.gather(*[
+            shipment.wait_for_status_async([ShippingService.SHIPPING_COMPLETED], timeout=5)
+            for shipment in shipments
+        ])
+
+    results = asyncio.run(wait_all())
+
+    assert results == [ShippingService.SHIPPING_COMPLETED] * 20
+    assert mock_repo.get_shipping_statuses.call_count < len(shipments)